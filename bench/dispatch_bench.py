@@ -0,0 +1,93 @@
+# on_message dispatch benchmark: replays a message stream through the old and new paths
+# usage: python bench/dispatch_bench.py [--stream messages.jsonl] [--messages 200000]
+#
+# a recorded stream is one json object per line: {"content": "...", "bot": false, "guild": 123}
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from discord.ext import commands  # noqa: E402
+
+from bot import MusicBot  # noqa: E402
+
+BOT_ID = 800000000000000000
+WORDS = "lol yeah the song is so good did you see that stream tonight gg wp brb who is playing".split()
+
+
+def synthetic_stream(count, command_ratio=0.03, bot_ratio=0.05, guilds=50, seed=1):
+    rng = random.Random(seed)
+    for _ in range(count):
+        roll = rng.random()
+        if roll < command_ratio:
+            content = rng.choice(("`play never gonna give you up", "`skip", "`q", f"<@!{BOT_ID}> queue"))
+        else:
+            content = " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 12)))
+        yield {"content": content, "bot": roll > 1 - bot_ratio, "guild": rng.randrange(guilds)}
+
+
+def load_stream(path):
+    with open(path, "r", encoding="UTF-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def make_messages(records):  # just the attributes the dispatch path reads
+    guilds = {}
+    messages = []
+    for i, r in enumerate(records):
+        guild = guilds.setdefault(r["guild"], SimpleNamespace(id=r["guild"]))
+        author = SimpleNamespace(id=1000 + i % 500, bot=r["bot"])
+        messages.append(SimpleNamespace(content=r["content"], author=author, guild=guild, channel=None, _state=None))
+    return messages
+
+
+async def old_on_message(bot, msg):  # dispatch before the pre-filter
+    if not msg.author.bot:
+        await bot.process_commands(msg)
+
+
+async def old_prefix(bot, msg):
+    return commands.when_mentioned_or("`")(bot, msg)
+
+
+async def replay(bot, messages, handler):
+    start = time.perf_counter()
+    for msg in messages:
+        await handler(msg)
+    return len(messages) / (time.perf_counter() - start)
+
+
+async def run(messages):
+    bot = MusicBot()
+    bot._connection.user = SimpleNamespace(id=BOT_ID, mention=f"<@{BOT_ID}>")  # logged in user, without logging in
+    bot.invoke = lambda ctx: asyncio.sleep(0)  # commands themselves are not measured
+
+    bot.command_prefix = old_prefix
+    before = await replay(bot, messages, lambda msg: old_on_message(bot, msg))
+
+    bot.command_prefix = bot.prefix
+    after = await replay(bot, messages, bot.on_message)
+
+    print(f"{len(messages)} messages")
+    print(f"before: {before:>12,.0f} msg/s")
+    print(f"after:  {after:>12,.0f} msg/s  ({after / before:.1f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="on_message dispatch benchmark")
+    parser.add_argument("--stream", help="recorded message stream (jsonl)")
+    parser.add_argument("--messages", type=int, default=200_000, help="synthetic stream length")
+    args = parser.parse_args()
+
+    records = load_stream(args.stream) if args.stream else list(synthetic_stream(args.messages))
+    asyncio.run(run(make_messages(records)))
+
+
+if __name__ == '__main__':
+    main()
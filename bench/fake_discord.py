@@ -0,0 +1,178 @@
+# Fake Discord gateway and REST for driving MusicBot offline
+#
+# gateway: payloads (READY user, GUILD_CREATE, MESSAGE_CREATE, VOICE_STATE_UPDATE, VOICE_SERVER_UPDATE) are fed
+# straight into discord.py's connection state parsers, so caching and event dispatch are the real ones.
+# REST: MusicBot.http.request is replaced, replies look like discord's and the bot's own messages come back
+# through MESSAGE_CREATE like they would on the gateway.
+import asyncio
+import datetime as dt
+import itertools
+import time
+from collections import Counter, defaultdict
+
+from discord.user import ClientUser
+
+EPOCH = 1420070400000  # discord snowflake epoch (ms)
+
+
+class Snowflakes:
+    def __init__(self):
+        self._counter = itertools.count(1)
+
+    def __call__(self):
+        return ((int(time.time() * 1000) - EPOCH) << 22) | (next(self._counter) & 0x3FFFFF)
+
+
+def _timestamp():
+    return dt.datetime.now(dt.timezone.utc).isoformat()
+
+
+def user_payload(user_id, name, bot=False):
+    return {"id": str(user_id), "username": name, "discriminator": "0001", "avatar": None, "bot": bot}
+
+
+# voice_state requests from wavelink, answered like the gateway would
+class FakeShardSocket:
+    def __init__(self, gateway):
+        self.gateway = gateway
+        self.open = True
+
+    async def voice_state(self, guild_id, channel_id, self_mute=False, self_deaf=False):
+        self.gateway.voice_update(guild_id, self.gateway.bot.user.id, channel_id, self_mute=self_mute, self_deaf=self_deaf)
+
+
+class FakeShard:
+    def __init__(self, gateway, shard_id=0):
+        self.id = shard_id
+        self.ws = FakeShardSocket(gateway)
+
+    async def close(self):
+        self.ws.open = False
+
+
+# in process discord: guilds with a text and a voice channel, users sitting in voice
+class FakeDiscord:
+    def __init__(self, bot, rest_latency=0.0):
+        self.bot = bot
+        self.state = bot._connection
+        self.rest_latency = rest_latency  # seconds every REST call takes
+        self.snowflake = Snowflakes()
+        self.guilds = []  # (guild id, text channel id, voice channel id, [user ids])
+        self.requests = Counter()  # "METHOD /path" -> calls
+        self.replies = defaultdict(list)  # channel id -> perf_counter of every bot message sent or edited
+        self.user = user_payload(self.snowflake(), "SenPy", bot=True)
+
+    # gateway
+    def login(self):  # what READY would give: the bot user and the shard socket wavelink sends voice states to
+        self.state.user = ClientUser(state=self.state, data=self.user)
+        self.bot._AutoShardedClient__shards = {0: FakeShard(self)}
+        self.bot.http.request = self.request
+
+    def ready(self):
+        self.bot._ready.set()
+
+    def add_guild(self, users=3):
+        guild_id, text_id, voice_id = self.snowflake(), self.snowflake(), self.snowflake()
+        user_ids = [self.snowflake() for _ in range(users)]
+        everyone = {"id": str(guild_id), "name": "@everyone", "permissions": "104324673", "position": 0,
+                    "color": 0, "hoist": False, "managed": False, "mentionable": False}
+        members = [
+            {"user": user_payload(u, f"user{i}"), "roles": [], "joined_at": _timestamp(), "deaf": False, "mute": False}
+            for i, u in enumerate(user_ids)
+        ]
+        members.append({"user": self.user, "roles": [], "joined_at": _timestamp(), "deaf": False, "mute": False})
+        channel = {"permission_overwrites": [], "position": 0, "parent_id": None, "nsfw": False}
+        self.state._add_guild_from_data({
+            "id": str(guild_id),
+            "name": f"guild {len(self.guilds)}",
+            "owner_id": str(user_ids[0]),
+            "region": "europe",
+            "roles": [everyone],
+            "members": members,
+            "member_count": len(members),
+            "channels": [
+                {**channel, "id": str(text_id), "type": 0, "name": "music", "topic": None, "last_message_id": None},
+                {**channel, "id": str(voice_id), "type": 2, "name": "Music", "bitrate": 64000, "user_limit": 0},
+            ],
+            "voice_states": [
+                {"user_id": str(u), "channel_id": str(voice_id), "session_id": f"s{u}", "deaf": False, "mute": False,
+                 "self_deaf": False, "self_mute": False, "suppress": False}
+                for u in user_ids
+            ],
+            "emojis": [],
+            "features": [],
+        })
+        self.guilds.append((guild_id, text_id, voice_id, user_ids))
+        return self.guilds[-1]
+
+    def message(self, guild_id, channel_id, user_id, content, member=True):
+        data = {
+            "id": str(self.snowflake()),
+            "channel_id": str(channel_id),
+            "guild_id": str(guild_id),
+            "author": self.user if user_id == self.bot.user.id else user_payload(user_id, "user"),
+            "content": content,
+            "timestamp": _timestamp(),
+            "edited_timestamp": None,
+            "tts": False,
+            "mention_everyone": False,
+            "mentions": [],
+            "mention_roles": [],
+            "attachments": [],
+            "embeds": [],
+            "pinned": False,
+            "type": 0,
+        }
+        if member:
+            data["member"] = {"roles": [], "joined_at": _timestamp(), "deaf": False, "mute": False}
+        self.state.parse_message_create(data)
+        return data
+
+    def voice_update(self, guild_id, user_id, channel_id, **flags):
+        data = {
+            "guild_id": str(guild_id), "user_id": str(user_id), "channel_id": str(channel_id) if channel_id else None,
+            "session_id": f"s{user_id}", "deaf": False, "mute": False, "self_deaf": flags.get("self_deaf", False),
+            "self_mute": flags.get("self_mute", False), "suppress": False,
+        }
+        self.state.parse_voice_state_update(data)
+        self.bot.dispatch("socket_response", {"t": "VOICE_STATE_UPDATE", "d": data})  # wavelink listens to raw events
+        if user_id == self.bot.user.id and channel_id:
+            server = {"guild_id": str(guild_id), "token": "fake", "endpoint": "localhost"}
+            self.bot.dispatch("socket_response", {"t": "VOICE_SERVER_UPDATE", "d": server})
+
+    # REST
+    async def request(self, route, *, files=None, form=None, **kwargs):
+        self.requests[f"{route.method} {route.path}"] += 1
+        if self.rest_latency:
+            await asyncio.sleep(self.rest_latency)
+
+        if route.path == "/channels/{channel_id}/messages" and route.method == "POST":
+            return self.sent(route, kwargs.get("json", {}), self.snowflake())
+        if route.path == "/channels/{channel_id}/messages/{message_id}" and route.method == "PATCH":
+            return self.sent(route, kwargs.get("json", {}), int(route.url.rsplit("/", 1)[1]), edited=True)
+        return None  # reactions, deletes
+
+    def sent(self, route, payload, message_id, edited=False):
+        channel_id = int(route.channel_id)
+        self.replies[channel_id].append(time.perf_counter())
+        channel = self.bot.get_channel(channel_id)
+        data = {
+            "id": str(message_id),
+            "channel_id": str(channel_id),
+            "guild_id": str(channel.guild.id) if channel else None,
+            "author": self.user,
+            "content": payload.get("content") or "",
+            "timestamp": _timestamp(),
+            "edited_timestamp": _timestamp() if edited else None,
+            "tts": False,
+            "mention_everyone": False,
+            "mentions": [],
+            "mention_roles": [],
+            "attachments": [],
+            "embeds": [payload["embed"]] if payload.get("embed") else [],
+            "pinned": False,
+            "type": 0,
+        }
+        if not edited and channel is not None:
+            self.state.parse_message_create(dict(data))  # the gateway echoes the bot's own messages
+        return data
@@ -0,0 +1,264 @@
+# Fake Lavalink (v3 protocol) node for local testing without Java or network access
+# usage: python bench/fake_lavalink.py --port 2333 [--password youshallnotpass] [--load 0.1] [--speed 60] [--stuck 0.01]
+#
+# REST: /loadtracks (synthetic results, `list=` queries return a playlist) and /decodetrack
+# websocket: accepts voiceUpdate/play/stop/pause/seek/volume/destroy, emits TrackStart/TrackEnd/TrackStuck
+# events, playerUpdate and periodic stats. Kill the process to test node failover.
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import random
+import time
+
+from aiohttp import web, WSMsgType
+
+
+def make_track(query, index=0, length=180_000):
+    digest = hashlib.sha1(f"{query}:{index}".encode()).digest()
+    identifier = base64.urlsafe_b64encode(digest).decode()[:11]
+    info = {
+        "identifier": identifier,
+        "isSeekable": True,
+        "author": "Fake Lavalink",
+        "length": length,
+        "isStream": False,
+        "position": 0,
+        "title": f"{query} #{index + 1}",
+        "uri": f"https://www.youtube.com/watch?v={identifier}",
+    }
+    return {"track": base64.b64encode(json.dumps(info).encode()).decode(), "info": info}
+
+
+def decode_track(track):
+    return json.loads(base64.b64decode(track))
+
+
+class FakePlayer:
+    def __init__(self, node, guild_id):
+        self.node = node
+        self.guild_id = guild_id
+        self.track = None
+        self.started = 0.0  # monotonic time the track position was last anchored
+        self.offset = 0  # track position (ms) at self.started
+        self.paused = False
+        self.end_task = None
+
+    @property
+    def position(self):
+        if self.track is None:
+            return 0
+        if self.paused:
+            return self.offset
+        return self.offset + int((time.monotonic() - self.started) * 1000 * self.node.speed)
+
+    def anchor(self, position):
+        self.offset = position
+        self.started = time.monotonic()
+        self.schedule_end()
+
+    def schedule_end(self):
+        if self.end_task is not None:
+            self.end_task.cancel()
+            self.end_task = None
+
+        if self.track is not None and not self.paused:
+            remaining = (self.length - self.position) / 1000 / self.node.speed
+            self.end_task = asyncio.ensure_future(self.finish(max(remaining, 0)))
+
+    @property
+    def length(self):
+        return decode_track(self.track)["length"]
+
+    async def finish(self, delay):
+        if random.random() < self.node.stuck:  # stalls halfway, lavalink reports it and keeps the track loaded
+            await asyncio.sleep(delay / 2)
+            await self.node.event(self.guild_id, "TrackStuckEvent", track=self.track, thresholdMs=10_000)
+            delay /= 2
+
+        await asyncio.sleep(delay)
+        track, self.track, self.end_task = self.track, None, None
+        await self.node.event(self.guild_id, "TrackEndEvent", track=track, reason="FINISHED")
+
+    async def play(self, track, start=0, no_replace=False):
+        if self.track is not None:
+            if no_replace:
+                return
+            old = self.track
+            self.track = None
+            await self.node.event(self.guild_id, "TrackEndEvent", track=old, reason="REPLACED")
+
+        self.track = track
+        self.paused = False
+        self.anchor(start)
+        await self.node.event(self.guild_id, "TrackStartEvent", track=track)
+
+    async def stop(self, reason="STOPPED"):
+        if self.track is None:
+            return
+        track, self.track = self.track, None
+        self.schedule_end()
+        await self.node.event(self.guild_id, "TrackEndEvent", track=track, reason=reason)
+
+
+class FakeNode:
+    def __init__(self, password, load=0.05, speed=1.0, stuck=0.0, stats_interval=5.0, update_interval=5.0):
+        self.password = password
+        self.load = load  # reported cpu systemLoad
+        self.speed = speed  # playback speed multiplier, makes tracks end sooner
+        self.stuck = stuck  # chance a track gets stuck
+        self.stats_interval = stats_interval
+        self.update_interval = update_interval
+        self.players = {}
+        self.sockets = set()
+        self.started = time.monotonic()
+        self.requests = 0
+
+    def authorized(self, request):
+        return request.headers.get("Authorization") == self.password
+
+    async def send(self, payload):
+        for ws in list(self.sockets):
+            if not ws.closed:
+                await ws.send_str(json.dumps(payload))
+
+    async def event(self, guild_id, type_, **data):
+        await self.send({"op": "event", "type": type_, "guildId": guild_id, **data})
+
+    def stats(self):
+        playing = sum(1 for p in self.players.values() if p.track is not None and not p.paused)
+        return {
+            "op": "stats",
+            "players": len(self.players),
+            "playingPlayers": playing,
+            "uptime": int((time.monotonic() - self.started) * 1000),
+            "memory": {"free": 1 << 28, "used": 1 << 27, "allocated": 1 << 29, "reservable": 1 << 30},
+            "cpu": {"cores": 4, "systemLoad": self.load, "lavalinkLoad": self.load / 2},
+            "frameStats": {"sent": 3000 * playing, "nulled": 0, "deficit": 0},
+        }
+
+    async def stats_loop(self):
+        while True:
+            await self.send(self.stats())
+            await asyncio.sleep(self.stats_interval)
+
+    async def update_loop(self):
+        while True:
+            await asyncio.sleep(self.update_interval)
+            now = int(time.time() * 1000)
+            for player in list(self.players.values()):
+                if player.track is not None:
+                    await self.send({
+                        "op": "playerUpdate",
+                        "guildId": player.guild_id,
+                        "state": {"time": now, "position": player.position},
+                    })
+
+    async def handle_op(self, data):
+        op, guild_id = data.get("op"), data.get("guildId")
+        if guild_id is None:
+            return
+
+        if op == "destroy":
+            if (player := self.players.pop(guild_id, None)) is not None:
+                player.track = None
+                player.schedule_end()
+            return
+
+        player = self.players.setdefault(guild_id, FakePlayer(self, guild_id))
+        if op == "play":
+            await player.play(data["track"], int(data.get("startTime") or 0), bool(data.get("noReplace")))
+        elif op == "stop":
+            await player.stop()
+        elif op == "pause":
+            position = player.position
+            player.paused = bool(data.get("pause"))
+            player.anchor(position)
+        elif op == "seek":
+            player.anchor(int(data.get("position", 0)))
+
+    # handlers
+    async def websocket(self, request):
+        if not self.authorized(request):
+            return web.Response(status=401)
+
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self.sockets.add(ws)
+        await ws.send_str(json.dumps(self.stats()))
+
+        try:
+            async for msg in ws:
+                if msg.type == WSMsgType.TEXT:
+                    await self.handle_op(json.loads(msg.data))
+        finally:
+            self.sockets.discard(ws)
+        return ws
+
+    async def load_tracks(self, request):
+        if not self.authorized(request):
+            return web.Response(status=401)
+
+        self.requests += 1
+        query = request.query.get("identifier", "")
+        if "list=" in query:
+            tracks = [make_track(query, i) for i in range(50)]
+            playlist = {"name": query, "selectedTrack": -1}
+            return web.json_response({"loadType": "PLAYLIST_LOADED", "playlistInfo": playlist, "tracks": tracks})
+
+        search = query.split(":", 1)[1] if query.startswith(("ytsearch:", "scsearch:")) else query
+        tracks = [make_track(search, i) for i in range(5 if search != query else 1)]
+        return web.json_response({"loadType": "SEARCH_RESULT", "playlistInfo": {}, "tracks": tracks})
+
+    async def decode_track(self, request):
+        if not self.authorized(request):
+            return web.Response(status=401)
+
+        try:
+            return web.json_response(decode_track(request.query["track"]))
+        except (KeyError, ValueError):
+            return web.json_response({"status": 500, "error": "Invalid track"}, status=500)
+
+    def app(self):
+        app = web.Application()
+        app.router.add_get("/", self.websocket)
+        app.router.add_get("/loadtracks", self.load_tracks)
+        app.router.add_get("/decodetrack", self.decode_track)
+
+        async def start_loops(app):
+            app["loops"] = [asyncio.ensure_future(self.stats_loop()), asyncio.ensure_future(self.update_loop())]
+
+        async def stop_loops(app):
+            for task in app["loops"]:
+                task.cancel()
+
+        app.on_startup.append(start_loops)
+        app.on_cleanup.append(stop_loops)
+        return app
+
+
+async def start(host="127.0.0.1", port=2333, **kwargs):  # start in the running loop, returns (node, runner)
+    node = FakeNode(**kwargs)
+    runner = web.AppRunner(node.app())
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    return node, runner
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake Lavalink node")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=2333)
+    parser.add_argument("--password", default="youshallnotpass")
+    parser.add_argument("--load", type=float, default=0.05, help="reported cpu systemLoad (0-1)")
+    parser.add_argument("--speed", type=float, default=1.0, help="playback speed multiplier")
+    parser.add_argument("--stuck", type=float, default=0.0, help="chance a track gets stuck (0-1)")
+    args = parser.parse_args()
+
+    node = FakeNode(args.password, load=args.load, speed=args.speed, stuck=args.stuck)
+    web.run_app(node.app(), host=args.host, port=args.port)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,198 @@
+# Load test: MusicBot and the Music cog against the fake discord and the fake lavalink, no network needed
+# usage: python bench/load_test.py [--guilds 1000] [--rounds 20] [--users 3] [--rest-latency 0.0] [--speed 60] [--stuck 0.01] [--admission]
+#                            [--runtime default|fast]
+#
+# every guild connects and queues a track, then each round sends one command per guild at once (play, skip,
+# queue, shuffle, pause/resume, previous and the odd playlist storm). Reports command throughput, p50/p99 of
+# invoke time (message in -> command done) and reply time (message in -> first bot message or edit), and RSS.
+import argparse
+import asyncio
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import fake_lavalink  # noqa: E402
+from fake_discord import FakeDiscord  # noqa: E402
+
+from bot import MusicBot, runtime  # noqa: E402
+from bot.data import config as cfg  # noqa: E402
+
+MIX = {"play": 4, "skip": 2, "queue": 2, "shuffle": 1, "pause": 1, "resume": 1, "previous": 1, "playlist": 0.1}
+PASSWORD = "youshallnotpass"
+
+
+def rss():  # current resident set size in bytes
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:  # not linux, peak instead of current
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def percentile(samples, p):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * p))] if samples else 0.0
+
+
+def configure(port, data_dir, admission):  # state files go to a temp dir, no metrics server, interactive waits cut short
+    cfg.nodes = {"BENCH": {
+        "host": "127.0.0.1", "port": port, "rest_uri": f"http://127.0.0.1:{port}", "password": PASSWORD,
+        "identifier": "BENCH", "region": "europe",
+    }}
+    cfg.state["path"] = str(Path(data_dir) / "player_state.journal")
+    cfg.search_cache["path"] = None
+    cfg.history["path"] = str(Path(data_dir) / "play_history.log")
+    cfg.metrics["enabled"] = False
+    cfg.profiler["signal"] = None
+    cfg.queue["page_timeout"] = 0  # queue pages stop listening for navigation right away
+    cfg.picker["timeout"] = 1
+    if not admission:  # every command runs, the storms measure the work commands do
+        cfg.admission.update(user=(10**9, 1), guild=(10**9, 1), searches=10**9)
+
+
+def content(kind, rng, videos):
+    prefix = cfg.bot["prefixes"][0]
+    if kind == "play":
+        return f"{prefix}play https://www.youtube.com/watch?v={rng.choice(videos)}"
+    if kind == "playlist":
+        return f"{prefix}play https://www.youtube.com/playlist?list=PL{rng.randrange(50):032d}"
+    if kind == "resume":
+        return f"{prefix}play"
+    if kind == "skip":
+        return f"{prefix}skip"
+    return f"{prefix}{kind}"
+
+
+async def watch_lag(samples, interval=0.01):
+    while True:
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        samples.append(time.perf_counter() - started - interval)
+
+
+async def run(args):
+    rng = random.Random(args.seed)
+    videos = ["".join(rng.choice("abcdefghijklmnopqrstuvwxyz0123456789_-") for _ in range(11)) for _ in range(500)]
+    node, runner = await fake_lavalink.start(port=args.port, password=PASSWORD, speed=args.speed, stuck=args.stuck)
+    baseline = rss()
+
+    bot = MusicBot(shard_ids=[0], shard_count=1)
+    discord = FakeDiscord(bot, args.rest_latency)
+    discord.login()
+    bot.setup()
+    music = bot.get_cog("Music")
+
+    started = time.perf_counter()
+    guilds = [discord.add_guild(args.users) for _ in range(args.guilds)]
+    gateway_rss = rss()
+    discord.ready()
+    await asyncio.wait_for(music.ready.wait(), 30)
+    print(f"{args.guilds} guilds ready in {time.perf_counter() - started:.2f}s")
+
+    pending = {}  # message id -> (kind, channel id, injected at)
+    done = asyncio.Event()
+    invoke_times = defaultdict(list)  # kind -> seconds
+    sent = []  # (kind, channel id, injected at)
+    invoke = bot.invoke
+
+    async def timed_invoke(ctx):
+        await invoke(ctx)
+        if (entry := pending.pop(ctx.message.id, None)) is not None:
+            invoke_times[entry[0]].append(time.perf_counter() - entry[2])
+        if not pending:
+            done.set()
+
+    bot.invoke = timed_invoke
+
+    async def storm(kinds):
+        done.clear()
+        for (guild_id, text_id, _, users), kind in zip(guilds, kinds):
+            data = discord.message(guild_id, text_id, rng.choice(users), content(kind, rng, videos))
+            pending[int(data["id"])] = entry = (kind, text_id, time.perf_counter())
+            sent.append(entry)
+        await asyncio.wait_for(done.wait(), args.timeout)
+
+    await storm(["connect"] * len(guilds))
+    await storm(["play"] * len(guilds))
+
+    lag = []
+    lag_task = asyncio.ensure_future(watch_lag(lag))
+    started = time.perf_counter()
+    for _ in range(args.rounds):
+        await storm(rng.choices(list(MIX), weights=list(MIX.values()), k=len(guilds)))
+    elapsed = time.perf_counter() - started
+    lag_task.cancel()
+    while music.outbox.stats["channels"]:  # last coalesced replies
+        await asyncio.sleep(0.05)
+    workload_rss = rss()
+
+    reply_times = defaultdict(list)  # first bot message in the channel after the command
+    following = {}
+    for kind, channel_id, injected in reversed(sent):
+        replies = discord.replies[channel_id]
+        until = following.get(channel_id, float("inf"))
+        if (reply := next((t for t in replies if injected <= t < until), None)) is not None:
+            reply_times[kind].append(reply - injected)
+        following[channel_id] = injected
+
+    commands = args.rounds * len(guilds)
+    players = music.players
+    print(f"{commands} commands in {elapsed:.2f}s: {commands / elapsed:,.0f} commands/s")
+    print(f"{'command':<10} {'count':>7} {'invoke p50':>11} {'p99':>9} {'reply p50':>10} {'p99':>9}")
+    for kind in ("connect", *MIX):
+        if samples := invoke_times.get(kind):
+            replies = reply_times.get(kind)
+            print(
+                f"{kind:<10} {len(samples):>7} {1000 * percentile(samples, 0.5):>9.1f}ms {1000 * percentile(samples, 0.99):>7.1f}ms "
+                + (f"{1000 * percentile(replies, 0.5):>8.1f}ms {1000 * percentile(replies, 0.99):>7.1f}ms" if replies else f"{'-':>10} {'-':>9}")
+            )
+    print(f"loop lag p50 {1000 * percentile(lag, 0.5):.1f}ms p99 {1000 * percentile(lag, 0.99):.1f}ms max {1000 * max(lag, default=0):.1f}ms")
+    print(
+        f"RSS {baseline / 2**20:.1f} MiB at start, gateway state {(gateway_rss - baseline) / len(guilds) / 1024:.1f} KiB/guild, "
+        f"after workload {(workload_rss - baseline) / len(guilds) / 1024:.1f} KiB/guild ({workload_rss / 2**20:.1f} MiB)"
+    )
+    print(
+        f"players {len(players)}, queued tracks {sum(p.queue.length for p in players)}, "
+        f"lavalink loadtracks {node.requests}, REST calls {sum(discord.requests.values())}"
+    )
+    print("admission " + ", ".join(f"{k} {v}" for k, v in music.admission.stats.items()))
+    print("outbox " + ", ".join(f"{k} {v}" for k, v in music.outbox.stats.items() if not k.startswith("latency")))
+
+    for wavelink_node in music.wavelink.nodes.values():  # stop listening before the sockets go away
+        wavelink_node._websocket._task.cancel()
+    await bot.close()
+    await music.wavelink.session.close()
+    await runner.cleanup()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline load test for the Music cog")
+    parser.add_argument("--guilds", type=int, default=1000)
+    parser.add_argument("--users", type=int, default=3, help="users in each guild's voice channel")
+    parser.add_argument("--rounds", type=int, default=20, help="command storms after connect and first play")
+    parser.add_argument("--rest-latency", type=float, default=0.0, help="seconds every discord REST call takes")
+    parser.add_argument("--speed", type=float, default=60.0, help="fake lavalink playback speed multiplier")
+    parser.add_argument("--stuck", type=float, default=0.01, help="chance a track gets stuck")
+    parser.add_argument("--port", type=int, default=2399, help="fake lavalink port")
+    parser.add_argument("--timeout", type=float, default=120.0, help="seconds a storm may take")
+    parser.add_argument("--admission", action="store_true", help="keep the configured command budgets")
+    parser.add_argument("--runtime", default="default", choices=("default", "fast"), help="runtime profile")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    runtime.install(args.runtime)
+    with tempfile.TemporaryDirectory() as data_dir:
+        configure(args.port, data_dir, args.admission)
+        asyncio.run(run(args))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+# Queue microbenchmark: per-operation latency and memory from 10 to 100k tracks
+# usage: python bench/queue_bench.py
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from bot.cogs.music import Queue  # noqa: E402
+
+SIZES = (10, 100, 1_000, 10_000, 100_000)
+OPS = 2_000
+
+
+class FakeTrack:  # stands in for wavelink.Track
+    __slots__ = ("id", "title", "length")
+
+    def __init__(self, i):
+        self.id = f"track-{i}"
+        self.title = f"Track {i}"
+        self.length = 180_000
+
+
+def per_op(func, ops=OPS):  # average microseconds per call
+    start = time.perf_counter()
+    for _ in range(ops):
+        func()
+    return (time.perf_counter() - start) / ops * 1e6
+
+
+def bench(size):
+    queue = Queue()
+    queue.add(*(FakeTrack(i) for i in range(size)))
+    queue.position = size // 2  # cursor in the middle, history and upcoming both populated
+
+    results = {
+        "upcoming": per_op(lambda: bool(queue.upcoming) and len(queue.upcoming)),
+        "history": per_op(lambda: bool(queue.history) and len(queue.history)),
+        "page": per_op(lambda: queue.upcoming[:10]),
+        "current": per_op(lambda: queue.current_track),
+    }
+
+    def step():  # advance and rewind, queue stays where it was
+        queue.get_next_track()
+        queue.rewind()
+    step()  # first advance releases the history above max_history
+    results["advance"] = per_op(step)
+
+    # time to play through the whole queue
+    queue = Queue()
+    queue.add(*(FakeTrack(i) for i in range(size)))
+    start = time.perf_counter()
+    while queue.get_next_track() is not None:
+        pass
+    results["play_all"] = (time.perf_counter() - start) / size * 1e6
+
+    # memory still held after playing through the whole queue (history is bounded)
+    tracemalloc.start()
+    queue = Queue()
+    queue.add(*(FakeTrack(i) for i in range(size)))
+    while queue.get_next_track() is not None:
+        pass
+    results["kept_kib"] = tracemalloc.get_traced_memory()[0] / 1024
+    results["retained"] = queue.length
+    tracemalloc.stop()
+
+    return results
+
+
+def main():
+    header = ("tracks", "upcoming", "history", "page", "current", "advance", "play_all", "kept_kib", "retained")
+    print("latency in microseconds per operation")
+    print("".join(f"{h:>11}" for h in header))
+    for size in SIZES:
+        r = bench(size)
+        print(f"{size:>11}" + "".join(f"{r[h]:>11.2f}" for h in header[1:-1]) + f"{r['retained']:>11}")
+
+
+if __name__ == '__main__':
+    main()
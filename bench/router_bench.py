@@ -0,0 +1,107 @@
+# query router benchmark: old URL_REGEX classification vs the compiled router
+# usage: python bench/router_bench.py [--corpus queries.txt] [--rounds 2000]
+#
+# a corpus file is one query per line, as users type them after `play
+import argparse
+import re
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from bot.utils.router import route  # noqa: E402
+
+# the regex Music.play used to run on every query
+URL_REGEX = r"(?i)\b((?:https?://|www\d{0,3}[.]|[a-z0-9.\-]+[.][a-z]{2,4}/)(?:[^\s()<>]+|\(([^\s()<>]+|(\([^\s()<>]+\)))*\))+(?:\(([^\s()<>]+|(\([^\s()<>]+\)))*\)|[^\s`!()\[\]{};:'\".,<>?«»“”‘’]))"
+
+CORPUS = [
+    "never gonna give you up",
+    "rick astley never gonna give you up",
+    "Never Gonna Give You Up",
+    "lofi hip hop radio - beats to relax/study to",
+    "daft punk - get lucky (feat. pharrell williams)",
+    "AC/DC highway to hell",
+    "bohemian rhapsody queen official video",
+    "https://www.youtube.com/watch?v=dQw4w9WgXcQ",
+    "https://www.youtube.com/watch?v=dQw4w9WgXcQ&ab_channel=RickAstley",
+    "https://youtu.be/dQw4w9WgXcQ",
+    "https://youtu.be/dQw4w9WgXcQ?si=aB3dE5fG7hI9jK1l",
+    "https://youtu.be/dQw4w9WgXcQ?t=43",
+    "youtu.be/dQw4w9WgXcQ",
+    "https://m.youtube.com/watch?v=dQw4w9WgXcQ&feature=share",
+    "https://music.youtube.com/watch?v=dQw4w9WgXcQ&feature=share",
+    "https://www.youtube.com/shorts/aqz-KE-bpKQ",
+    "https://www.youtube.com/watch?v=jfKfPfyJRdk&list=PLOfHVjdi8y2g5bZzZbmLqZGM2Gs8xL2hH&index=3",
+    "https://www.youtube.com/playlist?list=PLOfHVjdi8y2g5bZzZbmLqZGM2Gs8xL2hH",
+    "https://www.youtube.com/playlist?list=PLOfHVjdi8y2g5bZzZbmLqZGM2Gs8xL2hH&si=Zx9",
+    "https://soundcloud.com/forss/flickermood",
+    "https://soundcloud.com/forss/flickermood?utm_source=clipboard&utm_medium=text&utm_campaign=social_sharing",
+    "https://m.soundcloud.com/forss/flickermood",
+    "https://soundcloud.com/forss/sets/soulhack",
+    "https://c418.bandcamp.com/album/minecraft-volume-alpha",
+    "https://c418.bandcamp.com/track/sweden?from=embed",
+    "https://www.twitch.tv/monstercat",
+    "https://twitch.tv/Monstercat",
+    "https://example.com/music/track01.mp3",
+    "https://cdn.example.org/audio/podcast-ep-12.ogg?token=abc123",
+    "http://radio.example.net:8000/stream.aac",
+    "https://open.spotify.com/track/4cOdK2wGLETKBW3PvgPWqT?si=1a2b3c",
+    "https://vimeo.com/76979871",
+    "www.youtube.com/watch?v=dQw4w9WgXcQ",
+    "scsearch:flickermood",
+    "ytsearch:never gonna give you up",
+]
+
+
+def load_corpus(path):
+    with open(path, "r", encoding="UTF-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def old_route(query):  # what Music.play used to do
+    return query if re.match(URL_REGEX, query) else f"ytsearch:{query}"
+
+
+def per_query(func, corpus, rounds):  # microseconds per query
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for query in corpus:
+            func(query)
+    return (time.perf_counter() - start) / (rounds * len(corpus)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="query router benchmark")
+    parser.add_argument("--corpus", help="file with one query per line")
+    parser.add_argument("--rounds", type=int, default=2000)
+    parser.add_argument("--show", action="store_true", help="print every route")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus) if args.corpus else CORPUS
+
+    before = per_query(old_route, corpus, args.rounds)
+    after = per_query(route, corpus, args.rounds)
+
+    routes = [route(q) for q in corpus]
+    if args.show:
+        for query, r in zip(corpus, routes):
+            print(f"{r.kind.name:<17} {r.query}  <- {query}")
+
+    old_keys = {old_route(q) for q in corpus}
+    new_keys = {r.query.casefold() if r.query.startswith("ytsearch:") else r.query for r in routes}
+    kinds = Counter(r.kind.name for r in routes)
+
+    print(f"{len(corpus)} queries, {args.rounds} rounds")
+    print(f"URL_REGEX: {before:6.2f} us/query")
+    print(f"router:    {after:6.2f} us/query ({before / after:.1f}x)")
+    pathological = "www." + "a(b)" * 5000 + "("  # long pasted garbage, the regex backtracks on it
+    print(f"worst case ({len(pathological)} chars): URL_REGEX {per_query(old_route, [pathological], 20):.0f} us, "
+          f"router {per_query(route, [pathological], 20):.0f} us")
+    print(f"distinct cache keys: {len(old_keys)} before, {len(new_keys)} after canonicalization")
+    print("kinds: " + ", ".join(f"{k} {n}" for k, n in kinds.most_common()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,143 @@
+# Runtime profile benchmark: json vs orjson decode/encode throughput, asyncio vs uvloop loop latency
+# usage: python bench/runtime_bench.py [--seconds 1.0] [--tasks 1000]
+#
+# payloads look like what the bot receives: gateway MESSAGE_CREATE, VOICE_STATE_UPDATE, a 250 member
+# GUILD_CREATE, lavalink playerUpdate and a 10 track /loadtracks response. Missing libraries are skipped.
+import argparse
+import asyncio
+import base64
+import json
+import time
+
+
+def lavalink_track(i):
+    identifier = f"{i:011d}"
+    info = {
+        "identifier": identifier, "isSeekable": True, "author": f"Artist {i}", "length": 180_000, "isStream": False,
+        "position": 0, "title": f"Song number {i} (Official Music Video)", "uri": f"https://www.youtube.com/watch?v={identifier}",
+    }
+    return {"track": base64.b64encode(json.dumps(info).encode()).decode(), "info": info}
+
+
+def user(i):
+    return {"id": str(10**17 + i), "username": f"user{i}", "discriminator": f"{i % 10000:04d}", "avatar": None}
+
+
+def payloads():
+    member = lambda i: {"user": user(i), "roles": [str(10**17 + 1)], "joined_at": "2021-01-01T00:00:00+00:00", "deaf": False, "mute": False}
+    message = {
+        "id": "812345678901234567", "channel_id": "812345678901234500", "guild_id": "812345678901234000",
+        "author": user(1), "member": member(1), "content": "`play never gonna give you up", "timestamp": "2021-01-01T00:00:00+00:00",
+        "edited_timestamp": None, "tts": False, "mention_everyone": False, "mentions": [], "mention_roles": [],
+        "attachments": [], "embeds": [], "pinned": False, "type": 0,
+    }
+    voice = {
+        "guild_id": "812345678901234000", "channel_id": "812345678901234501", "user_id": "812345678901234999",
+        "member": member(2), "session_id": "a" * 32, "deaf": False, "mute": False, "self_deaf": False,
+        "self_mute": False, "self_video": False, "suppress": False,
+    }
+    guild = {
+        "id": "812345678901234000", "name": "guild", "owner_id": str(10**17), "region": "europe", "roles": [],
+        "members": [member(i) for i in range(250)], "channels": [
+            {"id": str(10**17 + i), "type": i % 3, "name": f"channel-{i}", "position": i, "permission_overwrites": []}
+            for i in range(50)
+        ],
+        "voice_states": [dict(voice, user_id=str(10**17 + i)) for i in range(20)], "emojis": [], "features": [],
+    }
+    return {
+        "MESSAGE_CREATE": {"op": 0, "s": 42, "t": "MESSAGE_CREATE", "d": message},
+        "VOICE_STATE_UPDATE": {"op": 0, "s": 43, "t": "VOICE_STATE_UPDATE", "d": voice},
+        "GUILD_CREATE": {"op": 0, "s": 2, "t": "GUILD_CREATE", "d": guild},
+        "playerUpdate": {"op": "playerUpdate", "guildId": "812345678901234000", "state": {"time": 1610000000000, "position": 61000}},
+        "loadtracks": {"loadType": "SEARCH_RESULT", "playlistInfo": {}, "tracks": [lavalink_track(i) for i in range(10)]},
+    }
+
+
+def codecs():
+    found = {"json": (json.loads, lambda obj: json.dumps(obj, separators=(",", ":"), ensure_ascii=True))}
+    try:
+        import orjson
+    except ImportError:
+        print("orjson is not installed, skipping it")
+    else:
+        found["orjson"] = (orjson.loads, lambda obj: orjson.dumps(obj).decode("utf-8"))
+    return found
+
+
+def rate(func, seconds):  # calls per second
+    calls, started = 0, time.perf_counter()
+    while (elapsed := time.perf_counter() - started) < seconds:
+        for _ in range(100):
+            func()
+        calls += 100
+    return calls / elapsed
+
+
+def bench_codecs(seconds):
+    samples = {name: json.dumps(data) for name, data in payloads().items()}
+    found = codecs()
+    print(f"{'payload':<20} {'bytes':>7} " + " ".join(f"{name + ' decode/s':>16} {name + ' encode/s':>16}" for name in found))
+    for name, text in samples.items():
+        data = json.loads(text)
+        row = []
+        for loads, dumps in found.values():
+            row.append(f"{rate(lambda: loads(text), seconds / 10):>16,.0f}")
+            row.append(f"{rate(lambda: dumps(data), seconds / 10):>16,.0f}")
+        print(f"{name:<20} {len(text):>7} " + " ".join(row))
+
+
+def loops():
+    found = {"asyncio": asyncio.new_event_loop}
+    try:
+        import uvloop
+    except ImportError:
+        print("uvloop is not installed, skipping it")
+    else:
+        found["uvloop"] = uvloop.new_event_loop
+    return found
+
+
+async def churn(stop, switches):  # a busy bot: many tasks handing control back and forth
+    while not stop.is_set():
+        await asyncio.sleep(0)
+        switches[0] += 1
+
+
+async def bench_loop(seconds, tasks):
+    stop = asyncio.Event()
+    switches = [0]
+    workers = [asyncio.ensure_future(churn(stop, switches)) for _ in range(tasks)]
+    late = []
+    started = time.perf_counter()
+    while time.perf_counter() - started < seconds:
+        before = time.perf_counter()
+        await asyncio.sleep(0.001)
+        late.append(time.perf_counter() - before - 0.001)
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await asyncio.gather(*workers)
+
+    late.sort()
+    return switches[0] / elapsed, late[len(late) // 2], late[int(len(late) * 0.99)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="json vs orjson and asyncio vs uvloop")
+    parser.add_argument("--seconds", type=float, default=1.0, help="seconds per loop measurement, codecs use a tenth per payload")
+    parser.add_argument("--tasks", type=int, default=1000, help="busy tasks while measuring timer lateness")
+    args = parser.parse_args()
+
+    bench_codecs(args.seconds)
+    print()
+    print(f"{'loop':<8} {'task switches/s':>16} {'timer late p50':>15} {'p99':>9}")
+    for name, new_loop in loops().items():
+        loop = new_loop()
+        try:
+            switches, p50, p99 = loop.run_until_complete(bench_loop(args.seconds, args.tasks))
+        finally:
+            loop.close()
+        print(f"{name:<8} {switches:>16,.0f} {1000 * p50:>13.2f}ms {1000 * p99:>7.2f}ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+# Track memory benchmark: every guild holding its own decoded tracks vs tracks interned in a TrackRegistry
+# usage: python bench/track_memory.py [--guilds 1000] [--queue 50] [--popular 200] [--playlist 100]
+#
+# queues mix popular tracks (zipf), one playlist loaded by a share of the guilds and tracks nobody else plays.
+# Every guild decodes its tracks from its own lavalink json, like separate searches and journal restores do.
+import argparse
+import base64
+import gc
+import json
+import random
+import sys
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import wavelink  # noqa: E402
+
+from bot.cogs.music import Queue  # noqa: E402
+from bot.utils import TrackRegistry  # noqa: E402
+
+
+def lavalink_track(i):  # what /loadtracks returns for one track, encoded id included
+    identifier = f"{i:011d}"
+    info = {
+        "identifier": identifier, "isSeekable": True, "author": f"Artist {i % 997}", "length": 180_000 + i % 120_000,
+        "isStream": False, "position": 0, "title": f"Song number {i} (Official Music Video)",
+        "uri": f"https://www.youtube.com/watch?v={identifier}",
+    }
+    return {"track": base64.b64encode(json.dumps(info).encode()).decode(), "info": info}
+
+
+def workload(args, rng):  # guild -> raw json of its queue
+    popular = range(args.popular)
+    weights = [1 / (rank + 1) for rank in popular]
+    playlist = range(args.popular, args.popular + args.playlist)
+    unique = iter(range(args.popular + args.playlist, 10**9))
+
+    for _ in range(args.guilds):
+        ids = list(playlist) if rng.random() < args.playlist_share else []
+        while len(ids) < args.queue + len(playlist) * bool(ids):
+            ids.append(rng.choices(popular, weights)[0] if rng.random() < args.popular_share else next(unique))
+        yield json.dumps([lavalink_track(i) for i in ids])
+
+
+def build(raws, registry=None):
+    queues = []
+    for raw in raws:
+        tracks = [wavelink.Track(id_=data["track"], info=data["info"]) for data in json.loads(raw)]
+        queue = Queue()
+        queue.add(*(map(registry.intern, tracks) if registry is not None else tracks))
+        queues.append(queue)
+    return queues
+
+
+def measure(raws, registry=None):
+    gc.collect()
+    tracemalloc.start()
+    queues = build(raws, registry)
+    gc.collect()
+    held = tracemalloc.get_traced_memory()[0]
+    queued = sum(q.length for q in queues)
+
+    del queues[::2]  # half of the guilds leave, their tracks should go with them
+    gc.collect()
+    after_leave = tracemalloc.get_traced_memory()[0]
+    alive = len(registry) if registry is not None else None
+    tracemalloc.stop()
+    return held, after_leave, queued, alive
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Track memory: per guild copies vs shared tracks")
+    parser.add_argument("--guilds", type=int, default=1000)
+    parser.add_argument("--queue", type=int, default=50, help="tracks per guild besides the playlist")
+    parser.add_argument("--popular", type=int, default=200, help="tracks many guilds play")
+    parser.add_argument("--popular-share", type=float, default=0.6, help="share of queued tracks from the popular ones")
+    parser.add_argument("--playlist", type=int, default=100, help="tracks in the playlist loaded everywhere")
+    parser.add_argument("--playlist-share", type=float, default=0.2, help="share of guilds that loaded the playlist")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    raws = list(workload(args, random.Random(args.seed)))
+    registry = TrackRegistry()
+    copies, copies_left, queued, _ = measure(raws)
+    shared, shared_left, _, alive = measure(raws, registry)
+
+    print(f"{args.guilds} guilds, {queued} queued tracks")
+    print(f"{'layout':<8} {'memory':>10} {'per guild':>11} {'after half leave':>17}")
+    for name, held, left in (("copies", copies, copies_left), ("shared", shared, shared_left)):
+        print(f"{name:<8} {held / 2**20:>8.1f}MiB {held / args.guilds / 1024:>9.1f}KiB {left / 2**20:>15.1f}MiB")
+    print(f"shared uses {shared / copies:.0%} of the memory, {copies / shared:.1f}x less")
+    print(
+        f"registry: {registry.created} tracks created, {registry.hits} duplicates shared, "
+        f"{alive} still alive after half the guilds left, {len(registry)} once every queue is gone"
+    )
+
+
+if __name__ == '__main__':
+    main()
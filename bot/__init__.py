@@ -1 +1,2 @@
-from .bot import MusicBot
\ No newline at end of file
+from .bot import MusicBot
+from .cluster import Cluster
\ No newline at end of file
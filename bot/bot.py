@@ -1,55 +1,156 @@
+import asyncio
+import signal
+import time
+from contextlib import contextmanager
 from pathlib import Path
 
 import discord
 from discord.ext import commands
 
-class MusicBot(commands.Bot):
-    def __init__(self):
+from .data import config as cfg
+from .utils import Metrics, Profiler
+
+
+def read_token():
+    with open("./bot/data/token.0", "r", encoding="UTF-8") as f: # token reading
+        return f.read()
+
+
+class MusicBot(commands.AutoShardedBot):
+    def __init__(self, shard_ids=None, shard_count=None, cluster_id=None, health=None):
         self._cogs = [p.stem for p in Path(".").glob("./bot/cogs/*.py")] # cogs loading
-        super().__init__(command_prefix=self.prefix, case_insensitive=True, intensts=discord.Intents.all()) # prefix
+        self.cluster_id = cluster_id  # None when not running under the cluster supervisor
+        self.health = health  # queue for heartbeats to the cluster supervisor
+        self.guild_prefixes = dict(cfg.bot["guild_prefixes"])  # guild id -> prefixes overriding the default ones
+        self._prefix_table = {}  # guild id -> tuple of mention forms + prefixes, built on first message
+        self.started_at = time.perf_counter()
+        self.startup = {}  # phase -> (start, end) in seconds since startup, phases can overlap
+        self.metrics = Metrics()
+        self.command_latency = self.metrics.histogram("senpy_command_seconds", "Command invocation time.", ("command",))
+        self.command_errors = self.metrics.counter("senpy_command_errors_total", "Failed command invocations.", ("command",))
+        self.gateway_events = self.metrics.counter("senpy_gateway_events_total", "Gateway connects, disconnects and resumes.", ("event",))
+        self.metrics.gauge("senpy_guilds", "Guilds seen by this process.", lambda: len(self.guilds))
+        self.metrics.gauge("senpy_gateway_latency_seconds", "Average gateway heartbeat latency.", lambda: self.latency)
+        self.metrics.gauge(
+            "senpy_startup_seconds", "Startup phase durations.",
+            lambda: {(p,): end - start for p, (start, end) in self.startup.items()}, ("phase",),
+        )
+        self.profiler = Profiler(**cfg.profiler["report"], waiters=lambda: {e: len(l) for e, l in self._listeners.items()})
+        super().__init__(
+            command_prefix=self.prefix, case_insensitive=True, intensts=discord.Intents.all(),  # prefix
+            shard_ids=shard_ids, shard_count=shard_count,  # None lets discord decide the shard count
+        )
         
     def setup(self):
         print("Settup running")
         
-        for cog in self._cogs:
-            self.load_extension(f"bot.cogs.{cog}")
-            print(f"Loaded {cog} cog.")
+        with self.phase("cogs"):
+            for cog in self._cogs:
+                self.load_extension(f"bot.cogs.{cog}")
+                print(f"Loaded {cog} cog.")
+        
+        if self.health is not None:
+            self.loop.create_task(self.report_health())
+        
+        if cfg.metrics["enabled"]:  # every cluster worker listens on its own port
+            port = cfg.metrics["port"] + (self.cluster_id or 0)
+            self.loop.create_task(self.metrics.start(cfg.metrics["host"], port, cfg.metrics["lag_interval"]))
+        
+        if (signum := getattr(signal, cfg.profiler["signal"] or "", None)) is not None:  # e.g. kill -USR1 <pid>
+            try:
+                self.loop.add_signal_handler(signum, lambda: self.loop.create_task(self.profile()))
+            except NotImplementedError:  # windows event loops
+                pass
         
         print("setup completed")
         
     def run(self):
+        self.started_at = time.perf_counter()
         self.setup()
         
-        with open("./bot/data/token.0", "r", encoding="UTF-8") as f: # token reading
-            TOKEN = f.read()
+        TOKEN = read_token()
         
         print("Running Bot")
         super().run(TOKEN, reconnect=True)
         
     async def shutdown(self):
         print("Shutdown bot connection")
+        await self.metrics.close()
         await super().close()
         
     async def close(self):
         print("Keyboard interrupt")
         await self.shutdown()
     
+    @contextmanager
+    def phase(self, name):  # startup timing
+        start = time.perf_counter() - self.started_at
+        try:
+            yield
+        finally:
+            self.startup[name] = (start, time.perf_counter() - self.started_at)
+            
+    def report_startup(self):
+        phases = sorted(self.startup.items(), key=lambda p: p[1][0])
+        print("Startup: " + " | ".join(f"{name} {start:.2f}-{end:.2f}s" for name, (start, end) in phases))
+        
+    async def login(self, token, *, bot=True):
+        with self.phase("login"):
+            await super().login(token, bot=bot)
+        
+    async def profile(self, seconds=None):  # signal triggered profile, summary goes to the console
+        if (report := await self.profiler.run(seconds or cfg.profiler["seconds"])) is None:
+            return print("Profile already running")
+        
+        print("\n".join(report.summary))
+        print(f"Profile saved to {report.path}")
+    
     async def on_connect(self):
+        self.gateway_events.inc(("connect",))
         print("Bot connected to discord")
     
     async def on_resumed(self):
+        self.gateway_events.inc(("resume",))
         print("Bot resumed")
         
     async def on_disconnect(self):
+        self.gateway_events.inc(("disconnect",))
         print("Bot disconnected")
     
+    async def report_health(self):  # heartbeat for the cluster supervisor, sent while the shards identify too
+        while not self.is_closed():
+            music = self.get_cog("Music")
+            self.health.put_nowait({
+                "cluster": self.cluster_id,
+                "ready": self.is_ready(),
+                "guilds": len(self.guilds),
+                "players": len(music.players) if music else 0,
+                "latency": self.latency,
+                "time": time.time(),
+            })
+            await asyncio.sleep(cfg.cluster["health_interval"])
+        
     async def on_ready(self):
+        self.startup.setdefault("gateway", (self.startup["login"][1], time.perf_counter() - self.started_at))
         self.client_id = (await self.application_info()).id
         print("Bot is now ready to use.")
         print(35*"-")
         
+    def prefixes_for(self, guild_id):  # compiled prefix table, ready for str.startswith
+        try:
+            return self._prefix_table[guild_id]
+        except KeyError:
+            mentions = (f"<@{self.user.id}> ", f"<@!{self.user.id}> ")  # same forms as commands.when_mentioned
+            prefixes = tuple(self.guild_prefixes.get(guild_id, cfg.bot["prefixes"]))
+            table = self._prefix_table[guild_id] = mentions + prefixes
+            return table
+        
+    def set_prefixes(self, guild_id, prefixes):
+        self.guild_prefixes[guild_id] = list(prefixes)
+        self._prefix_table.pop(guild_id, None)
+        
     async def prefix(self, bot, msg):
-        return commands.when_mentioned_or("`")(bot, msg) # prefix
+        return list(self.prefixes_for(msg.guild.id if msg.guild else None)) # prefix
     
     async def process_commands(self, msg):
         ctx = await self.get_context(msg, cls=commands.Context)
@@ -57,6 +158,19 @@ class MusicBot(commands.Bot):
         if ctx.command is not None:
             await self.invoke(ctx)
             
+    async def invoke(self, ctx):  # timed, errors are handled (and counted) inside
+        started = time.perf_counter()
+        await super().invoke(ctx)
+        
+        if ctx.command is not None:
+            self.command_latency.observe(time.perf_counter() - started, (ctx.command.qualified_name,))
+            if ctx.command_failed:
+                self.command_errors.inc((ctx.command.qualified_name,))
+            
     async def on_message(self, msg):
-        if not msg.author.bot:
-            await self.process_commands(msg)
\ No newline at end of file
+        if msg.author.bot:
+            return
+        
+        # cheap pre-filter, most messages are chat and never need a Context
+        if msg.content.startswith(self.prefixes_for(msg.guild.id if msg.guild else None)):
+            await self.process_commands(msg)
@@ -0,0 +1,154 @@
+# imports
+import asyncio
+import math
+import multiprocessing
+import queue
+import time
+
+import discord
+
+from . import runtime
+from .bot import MusicBot, read_token
+from .data import config as cfg
+
+
+def run_worker(cluster_id, shard_ids, shard_count, health):  # worker process entry point
+    runtime.install(cfg.runtime["profile"])  # spawned workers start with a fresh interpreter
+    MusicBot(shard_ids=shard_ids, shard_count=shard_count, cluster_id=cluster_id, health=health).run()
+
+
+async def recommended_shards(token):  # shard count discord recommends for the bot
+    http = discord.http.HTTPClient()
+    await http.static_login(token.strip(), bot=True)
+    try:
+        shard_count, _ = await http.get_bot_gateway()
+    finally:
+        await http.close()
+
+    return shard_count
+
+
+# worker process running a slice of the shards
+class Worker:
+    def __init__(self, cluster_id, shard_ids):
+        self.cluster_id = cluster_id
+        self.shard_ids = shard_ids
+        self.process = None
+        self.started = 0.0
+        self.restarts = 0
+        self.failures = 0  # restarts in a row, reset once the worker stays up
+        self.restart_at = None  # monotonic time of a scheduled restart
+        self.health = None  # last heartbeat payload
+
+    @property
+    def last_seen(self):
+        return self.health["time"] if self.health else self.started
+
+
+# parent supervisor, splits shards across worker processes and keeps them running
+class Cluster:
+    def __init__(self, workers, shard_count=None, health_interval=15, heartbeat_timeout=90, identify_delay=5.5):
+        self.ctx = multiprocessing.get_context("spawn")  # workers start with a fresh interpreter and event loop
+        self.health = self.ctx.Queue()
+        self.workers_count = workers
+        self.shard_count = shard_count
+        self.health_interval = health_interval
+        self.heartbeat_timeout = heartbeat_timeout  # restart workers that stop reporting
+        self.identify_delay = identify_delay  # seconds per shard between worker starts (discord identify limit)
+        self.workers = []
+
+    def split_shards(self):
+        per_worker = math.ceil(self.shard_count / self.workers_count)
+        return [list(range(i, min(i + per_worker, self.shard_count))) for i in range(0, self.shard_count, per_worker)]
+
+    def start(self, worker):
+        worker.process = self.ctx.Process(
+            target=run_worker,
+            args=(worker.cluster_id, worker.shard_ids, self.shard_count, self.health),
+            name=f"SenPy-cluster-{worker.cluster_id}",
+        )
+        worker.process.start()
+        worker.started = time.time()
+        worker.restart_at = None
+        worker.health = None
+        print(f"Started cluster {worker.cluster_id} (shards {worker.shard_ids[0]}-{worker.shard_ids[-1]}).")
+
+    def stop(self, worker):
+        if worker.process is not None and worker.process.is_alive():
+            worker.process.terminate()
+            worker.process.join(10)
+            if worker.process.is_alive():
+                worker.process.kill()
+
+    def schedule_restart(self, worker, reason):
+        if time.time() - worker.started > 600:
+            worker.failures = 0
+
+        delay = min(2 ** worker.failures, 60)  # back off when a worker keeps crashing
+        worker.failures += 1
+        worker.restarts += 1
+        worker.restart_at = time.monotonic() + delay
+        print(f"Cluster {worker.cluster_id} {reason}, restarting in {delay}s.")
+
+    def drain_health(self):
+        try:
+            payload = self.health.get(timeout=1)  # doubles as the supervisor loop tick
+            while True:
+                self.workers[payload["cluster"]].health = payload
+                payload = self.health.get_nowait()
+        except queue.Empty:
+            pass
+
+    def check(self):
+        now = time.time()
+        for worker in self.workers:
+            if worker.restart_at is not None:
+                if time.monotonic() >= worker.restart_at:
+                    self.start(worker)
+            elif not worker.process.is_alive():
+                self.schedule_restart(worker, f"exited with code {worker.process.exitcode}")
+            elif now - worker.last_seen > self.heartbeat_timeout:
+                self.stop(worker)
+                self.schedule_restart(worker, "stopped reporting")
+
+    def report(self):
+        alive = [w for w in self.workers if w.health and w.health["ready"] and w.process.is_alive()]
+        guilds = sum(w.health["guilds"] for w in alive)
+        players = sum(w.health["players"] for w in alive)
+        print(f"Cluster health: {len(alive)}/{len(self.workers)} workers up, {guilds} guilds, {players} players")
+
+        for w in self.workers:
+            if w.health and w.health["ready"]:
+                print(
+                    f"  cluster {w.cluster_id}: {w.health['guilds']} guilds, {w.health['players']} players, "
+                    f"latency {w.health['latency'] * 1000:.0f} ms, seen {time.time() - w.last_seen:.0f}s ago, "
+                    f"{w.restarts} restarts"
+                )
+            else:
+                print(f"  cluster {w.cluster_id}: starting, {w.restarts} restarts")
+
+    def run(self):
+        if self.shard_count is None:
+            self.shard_count = asyncio.run(recommended_shards(read_token()))
+        self.workers_count = min(self.workers_count, self.shard_count)  # no idle workers
+
+        self.workers = [Worker(i, shard_ids) for i, shard_ids in enumerate(self.split_shards())]
+        print(f"Running {self.shard_count} shards on {len(self.workers)} workers.")
+
+        try:
+            for worker in self.workers:
+                self.start(worker)
+                time.sleep(self.identify_delay * len(worker.shard_ids))  # let its shards identify first
+
+            last_report = time.monotonic()
+            while True:
+                self.drain_health()
+                self.check()
+                if time.monotonic() - last_report >= self.health_interval:
+                    self.report()
+                    last_report = time.monotonic()
+        except KeyboardInterrupt:
+            print("Stopping cluster")
+        finally:
+            for worker in self.workers:
+                self.stop(worker)
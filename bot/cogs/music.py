@@ -1,20 +1,31 @@
 # imports
 import typing as t
-import re
 import datetime as dt
 import asyncio
+import math
 import random
+import sys
+import time
+import traceback
+from collections import deque
 from enum import Enum
+from functools import partial
+from pathlib import Path
 
 import discord
 import wavelink
 from discord.ext import commands
 
-from ..data.langs import music_py as mp
+from .. import runtime
+from ..data import config as cfg
+from ..utils import Admission, IdleReaper, PlayHistory, Locales, NodePool, Outbox, PlayerState, QueryKind, QueueJournal, QueuePages, SearchCache, TrackRegistry, TrackResolver, format_duration, route_query, used_keys
 
 
 #global vars
-URL_REGEX = r"(?i)\b((?:https?://|www\d{0,3}[.]|[a-z0-9.\-]+[.][a-z]{2,4}/)(?:[^\s()<>]+|\(([^\s()<>]+|(\([^\s()<>]+\)))*\))+(?:\(([^\s()<>]+|(\([^\s()<>]+\)))*\)|[^\s`!()\[\]{};:'\".,<>?«»“”‘’]))"
+PAGE_BUTTONS = { # queue pages navigation
+    "⬅️": -1,
+    "➡️": 1,
+}
 OPTIONS = { # choose track options 1-5
     "1️⃣": 0,
     "2⃣": 1,
@@ -27,6 +38,13 @@ colour_info = 0x5bc0de  # blue info colour
 colour_error = 0xdc3545  # red warning colour
 
 
+def summarize(samples):  # sorted seconds -> latency summary line
+    return (
+        f"avg {1000*sum(samples)/len(samples):.0f} ms | p50 {1000*samples[len(samples)//2]:.0f} ms | "
+        f"p95 {1000*samples[int(len(samples)*0.95)]:.0f} ms | max {1000*samples[-1]:.0f} ms ({len(samples)})"
+    )
+
+
 # errors
 class AlreadyConnectedToChannel(commands.CommandError):
     pass
@@ -64,76 +82,200 @@ class InvalidRepeatMode(commands.CommandError):
     pass
 
 
+class Throttled(commands.CommandError):
+    def __init__(self, retry_after):
+        super().__init__(f"Throttled, retry in {retry_after:.1f}s")
+        self.retry_after = retry_after
+
+
+class TooManySearches(commands.CommandError):
+    pass
+
+
+# answered by the commands' own error handlers
+HANDLED_ERRORS = (
+    AlreadyConnectedToChannel, NoVoiceChannel, QueueIsEmpty, PlayerIsAlreadyPaused, NoMoreTracks, NoPreviousTracks,
+    commands.MissingPermissions,
+)
+
+
 class RepeatMode(Enum):
     NONE = 0
     ONE = 1
     ALL = 2
     
 
+# read-only window over part of the queue, nothing is copied
+class QueueView:
+    __slots__ = ("_queue", "_range")
+    
+    def __init__(self, queue, start, stop):
+        self._queue = queue
+        self._range = range(max(start, 0), max(stop, 0))
+        
+    def __len__(self):
+        return len(self._range)
+    
+    def __bool__(self):
+        return bool(self._range)
+    
+    def __iter__(self):
+        return map(self._queue.__getitem__, self._range)
+    
+    def __reversed__(self):
+        return map(self._queue.__getitem__, reversed(self._range))
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):  # slicing copies only the requested part
+            return [self._queue[i] for i in self._range[index]]
+        
+        return self._queue[self._range[index]]
+
+
 # Queue class
 class Queue:
-    def __init__(self):
+    def __init__(self, max_history=None):
         self._queue = []
+        self._head = 0  # first kept history entry, older ones are released
+        self.released = 0  # played tracks released so far, `repeat all` can't loop over them anymore
         self.position = 0
         self.repeat_mode = RepeatMode.NONE
+        self.max_history = cfg.queue["max_history"] if max_history is None else max_history
+        self.on_change = None  # called with (method name, *args) after every mutation, feeds the state journal
+        self.version = 0  # bumped on every mutation, invalidates rendered queue pages
+        
+    def _changed(self, op, *args):
+        self.version += 1
+        if self.on_change is not None:
+            self.on_change(op, *args)
         
     @property
     def is_empty(self):
-        return not self._queue
+        return self._head >= len(self._queue)
     
     @property  # current track in queue
     def current_track(self):
-        if not self._queue:
+        if self.is_empty:
             raise QueueIsEmpty
         
-        if self.position <= len(self._queue) -1:
+        if self._head <= self.position < len(self._queue):
             return self._queue[self.position]
     
     @property  # next tracks in queue
     def upcoming(self):
-        if not self._queue:
+        if self.is_empty:
             raise QueueIsEmpty
         
-        return self._queue[self.position + 1:]
+        return QueueView(self._queue, self.position + 1, len(self._queue))
     
     @property  # tracks played in past
     def history(self):
-        if not self._queue:
+        if self.is_empty:
             raise QueueIsEmpty
         
-        return self._queue[:self.position]
+        return QueueView(self._queue, self._head, self.position)
     
     @property  # length of queue
     def length(self):
-        return len(self._queue)
+        return len(self._queue) - self._head
 
     def add(self, *args):
         self._queue.extend(args)  # extends queue with track/tracks
+        self._changed("add", *args)
+        
+    def _upcoming_index(self, index):  # upcoming index -> index in self._queue
+        return max(self.position + 1, self._head) + index
+    
+    def insert(self, index, *tracks):  # insert tracks before upcoming track at index
+        i = min(self._upcoming_index(max(index, 0)), len(self._queue))
+        self._queue[i:i] = tracks
+        self._changed("insert", index, *tracks)
+        
+    def remove(self, index, count=1):  # remove count upcoming tracks starting at index
+        if index < 0 or index >= len(self.upcoming):
+            raise IndexError("upcoming index out of range")
+        
+        i = self._upcoming_index(index)
+        removed = self._queue[i:i + count]
+        del self._queue[i:i + count]
+        self._changed("remove", index, count)
+        return removed
+    
+    def move(self, index, to, count=1):  # move count upcoming tracks from index to new index
+        self.insert(to, *self.remove(index, count))
     
     def get_next_track(self):
-        if not self._queue:
+        if self.is_empty:
             raise QueueIsEmpty
         
         self.position += 1
+        self._changed("get_next_track")
 
-        if self.position < 0:
+        if self.position < self._head:
             return None
         elif self.position > len(self._queue)-1:  # check if there's no songs left
             if self.repeat_mode == RepeatMode.ALL:
-                self.position = 0
+                self.position = self._head
             else:
                 return None
         
+        self._trim_history()
         return self._queue[self.position]
     
-    def shuffle(self):
-        if not self._queue:
+    def _next_index(self):  # index get_next_track would move to
+        i = self.position + 1
+        
+        if i < self._head:
+            return None
+        elif i > len(self._queue)-1:
+            return self._head if self.repeat_mode == RepeatMode.ALL and not self.is_empty else None
+        
+        return i
+    
+    def peek_next(self):  # next track without moving the cursor
+        if (i := self._next_index()) is not None:
+            return self._queue[i]
+        
+    def replace_current(self, track):  # same track reloaded, the cursor stays
+        if self._head <= self.position < len(self._queue):
+            self._queue[self.position] = track
+            self._changed("replace_current", track)
+    
+    def rewind(self, count=1):  # move cursor back, stop() advances once so previous uses 2
+        if self.is_empty:
             raise QueueIsEmpty
         
-        upcoming = self._queue  # to shuffle just upcoming tracks not all queue with history
-        random.shuffle(upcoming)
-        self._queue = self._queue[:self.position + 1]
-        self._queue.extend(upcoming)
+        self.position = max(self.position - count, self._head - 1)
+        self._changed("rewind", count)
+        
+    def _trim_history(self):
+        if self.max_history is None or self.repeat_mode == RepeatMode.ALL:  # looping needs all tracks
+            return
+        
+        keep_from = self.position - self.max_history
+        if keep_from <= self._head:
+            return
+        
+        for i in range(self._head, keep_from):  # release references to old tracks
+            self._queue[i] = None
+        self.released += keep_from - self._head
+        self._head = keep_from
+        
+        if self._head > len(self._queue) // 2:  # compact once released entries dominate (amortized O(1))
+            del self._queue[:self._head]
+            self.position -= self._head
+            self._head = 0
+    
+    def shuffle(self, seed=None):  # seeded so the journal can replay the same order
+        if self.is_empty:
+            raise QueueIsEmpty
+        
+        seed = random.getrandbits(32) if seed is None else seed
+        start = max(self.position + 1, self._head)  # shuffle just upcoming tracks, not history
+        upcoming = self._queue[start:]
+        random.Random(seed).shuffle(upcoming)
+        self._queue[start:] = upcoming
+        self._changed("shuffle", seed)
         
     def set_repeat_mode(self, mode):
         if mode in ["none", "0"]:
@@ -142,17 +284,54 @@ class Queue:
             self.repeat_mode = RepeatMode.ONE
         if mode == "all":
             self.repeat_mode = RepeatMode.ALL
+        
+        self._changed("set_repeat_mode", mode)
 
     def empty(self):  # clearing queue
+        self._head = 0
+        self.released = 0
         self.position = 0
         self._queue.clear()
+        self._changed("empty")
+        
+    def snapshot(self):  # compact state for the journal, history released by trimming is left out
+        return {
+            "tracks": self._queue[self._head:],
+            "position": self.position - self._head,
+            "repeat_mode": self.repeat_mode.value,
+            "released": self.released,
+        }
+    
+    def load_snapshot(self, data):
+        self._queue = list(data["tracks"])
+        self._head = 0
+        self.position = data["position"]
+        self.repeat_mode = RepeatMode(data["repeat_mode"])
+        self.released = data.get("released", 0)
+        self.version += 1
+        return self
 
 
 # custom Player class with full queue
 class Player(wavelink.Player):
-    def __init__(self, *args, **kwargs):
+    def __init__(self, *args, journal=None, outbox=None, locales=None, registry=None, **kwargs):
         super().__init__(*args, **kwargs)
-        self.queue = Queue()
+        self.journal = journal  # QueueJournal, None disables persistence
+        self.registry = registry  # TrackRegistry, reloaded tracks are shared with other guilds
+        self.outbox = outbox  # Outbox for status embeds, None sends them right away
+        self.locales = locales  # Locales, messages follow the guild language
+        self.attach_queue(Queue())
+        self.pages = QueuePages(cfg.queue["page_size"])
+        self.prefetched = None  # (queued track, reloaded track) for advance(), prepared before the current one ends
+        self._prefetch_task = None
+        self._ingest_task = None  # playlist being queued in the background
+        self._stopped_at = None  # perf_counter of last track end, for measuring gaps
+        self._jump = None  # next/previous steps gathered while a skip is taking effect
+        self._resuming = None  # id of a track picked up where it was (restore, node change), not a new play
+        
+    @property
+    def locale(self):
+        return self.locales.for_guild(self.guild_id)
         
     async def connect(self, ctx, channel=None):
         if self.is_connected:  # check for player connected
@@ -162,9 +341,13 @@ class Player(wavelink.Player):
             raise NoVoiceChannel
         
         await super().connect(channel.id)  # connecting to voice channel
+        self._journal("channel", channel.id)
         return channel
     
     async def p_disconnect(self):
+        self.cancel_prefetch()
+        self.cancel_ingest()
+        self._journal("close")
         try:
             await self.destroy()  # destroy player while disconnecting
         except KeyError:
@@ -175,125 +358,625 @@ class Player(wavelink.Player):
             raise NoTracksFound
         
         if isinstance(tracks, wavelink.TrackPlaylist):
-            self.queue.add(*tracks.tracks)
+            await self.add_playlist(ctx, tracks)
         elif len(tracks) == 1:
             self.queue.add(tracks[0])
-            embed = discord.Embed(title=f"{mp['added_tracks']} `{tracks[0].title}`.", colour=colour_info)
-            await ctx.send(embed=embed)
+            await self.notify(ctx, "added_tracks", title=tracks[0].title)
         else:
             if (track := await self.choose_track(ctx, tracks)) is not None:
                 self.queue.add(track)
-                embed = discord.Embed(title=f"{mp['added_tracks']} `{tracks[0].title}`.", colour=colour_info)
-                await ctx.send(embed=embed)
+                await self.notify(ctx, "added_tracks", title=track.title)
         
         if not self.is_playing and not self.queue.is_empty:
             await self.start_playback()
             
+    async def add_playlist(self, ctx, playlist):  # first track plays right away, the rest is queued in pages
+        tracks = playlist.tracks
+        name = playlist.data["playlistInfo"].get("name", "")
+        start = 0
+        
+        if self._ingest_task is None:  # nothing loading ahead of it, keeps the queue in playlist order
+            self.queue.add(tracks[0])
+            start = 1
+            if not self.is_playing:
+                await self.start_playback()
+        
+        msg = await ctx.send(embed=self.locale.embed("playlist_loading", name=name, added=start, total=len(tracks)))
+        self._ingest_task = self.bot.loop.create_task(self._ingest(msg, name, tracks, start, self._ingest_task))
+        
+    def cancel_ingest(self):
+        if self._ingest_task is not None:
+            self._ingest_task.cancel()
+            self._ingest_task = None
+    
+    async def _ingest(self, msg, name, tracks, start, previous):
+        page = cfg.playlist["page_size"]
+        added = start
+        edited_at = time.monotonic()
+        
+        try:
+            if previous is not None:  # playlists queued one after another
+                await asyncio.wait([previous])
+            
+            for i in range(start, len(tracks), page):
+                self.queue.add(*tracks[i:i+page])
+                added += len(tracks[i:i+page])
+                if not self.is_playing:
+                    await self.start_playback()
+                
+                if time.monotonic() - edited_at >= cfg.playlist["progress_interval"]:  # edits share the rate limit
+                    await self._edit_quietly(msg, self.locale.embed("playlist_loading", name=name, added=added, total=len(tracks)))
+                    edited_at = time.monotonic()
+                await asyncio.sleep(0)  # lets voice and gateway events through between pages
+            
+            await self._edit_quietly(msg, self.locale.embed("playlist_added", name=name, added=added, total=len(tracks)))
+        except asyncio.CancelledError:
+            if previous is not None:  # stops the whole chain
+                previous.cancel()
+            await asyncio.shield(self._edit_quietly(msg, self.locale.embed("playlist_cancelled", name=name, added=added, total=len(tracks))))
+            raise
+        finally:
+            if self._ingest_task is asyncio.current_task():
+                self._ingest_task = None
+                
+    @staticmethod
+    async def _edit_quietly(msg, embed):  # progress message deleted or not editable, tracks keep being queued
+        try:
+            await msg.edit(embed=embed)
+        except discord.HTTPException:
+            pass
+            
+    async def notify(self, ctx, key, **values):  # status embeds are coalesced per channel when there is an outbox
+        embed = self.locale.embed(key, **values)
+        if self.outbox is None:
+            return await ctx.send(embed=embed)
+        
+        self.outbox.post(ctx.channel, embed)
+            
     async def choose_track(self, ctx, tracks):
-        def _check(r, u):
+        def _check_reaction(r, u):
             return (
-                r.emoji in OPTIONS.keys()
+                r.emoji in options.keys()
                 and u == ctx.author
                 and r.message.id == msg.id
             )
-            
+        
+        def _check_message(m):  # typing the number works before the reactions are added
+            return (
+                m.author == ctx.author
+                and m.channel == ctx.channel
+                and m.content.strip() in numbers.keys()
+            )
+        
+        started = time.perf_counter()
+        options = dict(list(OPTIONS.items())[:min(len(tracks), len(OPTIONS))])
+        numbers = {str(1+i): i for i in options.values()}
+        
         embed = discord.Embed(
-            title = f"{mp['choose_track']}",
+            title = self.locale.text("choose_track"),
             description = (
                 "\n".join(
-                    f"**{1+i}.** {t.title} ({t.length//60000}:{str(t.length%60).zfill(2)})"  # (fix hours issue)
+                    f"**{1+i}.** {t.title} ({format_duration(t.length)})"
                     for i, t in enumerate(tracks[:5])
                 )    
             ),
             colour = ctx.author.colour,
             timestamp=dt.datetime.utcnow()
         )
-        embed.set_author(name=f"{mp['query_results']}")
-        embed.set_footer(text=f"{mp['invoke']} {ctx.author.display_name}", icon_url=ctx.author.avatar_url)
+        embed.set_author(name=self.locale.text("query_results"))
+        embed.set_footer(text=self.locale.text("invoke", author=ctx.author.display_name), icon_url=ctx.author.avatar_url)
+        
+        msg = await ctx.send(embed=embed)  # msg variable for check functions
+        picks = [  # listening before any reaction is added
+            self.bot.loop.create_task(self.bot.wait_for("reaction_add", check=_check_reaction)),
+            self.bot.loop.create_task(self.bot.wait_for("message", check=_check_message)),
+        ]
+        ready = time.perf_counter() - started
+        buttons = self.bot.loop.create_task(self.add_buttons(msg, options.keys()))
+        
+        try:
+            done, _ = await asyncio.wait(picks, timeout=cfg.picker["timeout"], return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            buttons_ready = buttons.result() if buttons.done() else None  # None if the pick came first
+            for task in (buttons, *picks):
+                task.cancel()
+        self.bot.dispatch("picker_ready", ready, buttons_ready)
         
-        msg = await ctx.send(embed=embed)  # msg variable for check function
-        for emoji in list(OPTIONS.keys())[:min(len(tracks), len(OPTIONS))]:
-            await msg.add_reaction(emoji)
         try:
-            reaction, _ = await self.bot.wait_for("reaction_add", timeout=60, check=_check)
-        except  asyncio.TimeoutError:
-            await msg.delete()
-            await ctx.message.delete()
-        else:
             await msg.delete()
-            return tracks[OPTIONS[reaction.emoji]]
+            if not done:  # timed out
+                await ctx.message.delete()
+        except discord.HTTPException:
+            pass
+        
+        if done:
+            result = done.pop().result()
+            if isinstance(result, tuple):  # (reaction, user)
+                return tracks[options[result[0].emoji]]
+            return tracks[numbers[result.content.strip()]]
+    
+    @staticmethod
+    async def add_buttons(msg, emojis):  # all reactions requested at once instead of one round trip each
+        started = time.perf_counter()
+        try:
+            await asyncio.gather(*(msg.add_reaction(emoji) for emoji in emojis))
+        except discord.HTTPException:  # message deleted or missing permissions, numbers still work
+            return None
+        return time.perf_counter() - started
+            
+    # persistence
+    def _journal(self, op, *args):
+        if self.journal is not None:
+            self.journal.record(self.guild_id, op, *args)
+    
+    def attach_queue(self, queue):
+        self.queue = queue
+        if self.journal is not None:
+            self.queue.on_change = partial(self.journal.record, self.guild_id)
+            
+    @property
+    def state(self):
+        return PlayerState(self.queue, self.channel_id, int(self.position), self.is_paused)
+    
+    async def restore(self, state):  # warm restart from the journal, tracks are already resolved
+        if state.queue.is_empty or (track := state.queue.current_track) is None:
+            return False  # nothing to play, joining voice would leave an idle player nobody disconnects
+        
+        self.attach_queue(state.queue)
+        await super().connect(state.channel_id)
+        self._journal("channel", state.channel_id)
+        self._resuming = track.id
+        await self.play(track, start=state.track_position)
+        if state.paused:
+            await self.set_pause(True)
+        return True
             
     async def start_playback(self):
         await self.play(self.queue.current_track)
         
-    async def advance(self):
+    async def advance(self):  # returns the track now playing, None when the queue is finished
         try:
             if (track := self.queue.get_next_track()) is not None:
+                if self.prefetched is not None and self.prefetched[0] is track:  # reloaded ahead of time
+                    track = self.prefetched[1]
+                    self.queue.replace_current(track)
+                self.prefetched = None
                 await self.play(track)
+                return track
+            else:
+                self._stopped_at = None  # nothing follows, no gap to measure
         except QueueIsEmpty:
-            pass
+            self._stopped_at = None
+            
+    async def change_node(self, identifier=None):  # failover, the current track goes on from its position
+        self._resuming = self.current.id if self.current is not None else None
+        try:
+            await super().change_node(identifier)
+        except Exception:
+            self._resuming = None
+            raise
+        
+    def resumed(self, track_id):  # True once for the TrackStart of a restored or moved track
+        resuming, self._resuming = self._resuming, None
+        return resuming is not None and resuming == track_id
+    
+    # prefetching
+    def schedule_prefetch(self):  # runs `lead` seconds before the current track ends
+        self.cancel_prefetch()
+        
+        if (track := self.current) is None or track.is_stream or not track.length:
+            return
+        
+        delay = (track.length - self.position) / 1000 - cfg.prefetch["lead"]
+        self._prefetch_task = self.bot.loop.create_task(self._prefetch_after(max(delay, 0)))
+        
+    def cancel_prefetch(self):
+        if self._prefetch_task is not None:
+            self._prefetch_task.cancel()
+            self._prefetch_task = None
+        
+        self.prefetched = None
+            
+    async def _prefetch_after(self, delay):
+        await asyncio.sleep(delay)
+        
+        try:
+            await self.prefetch()
+        except Exception as exc:  # prefetch is best effort, advance works without it
+            print(f"Prefetch failed for {self.guild_id}: {exc}")
+            
+    async def prefetch(self):
+        if self.queue.repeat_mode == RepeatMode.ONE:  # replays current track, nothing to prepare
+            return
+        
+        if (track := self.queue.peek_next()) is None:
+            return
+        
+        if cfg.prefetch["refresh"] and getattr(track, "stored", False):  # decodetrack can't tell if it's stale, reload it
+            self.prefetched = (track, await self.reload_track(track))
+        
+    async def reload_track(self, track):  # fresh encoding of a track from its URI, the track itself if that fails
+        if not track.uri or not (results := await self.node.get_tracks(track.uri)):
+            return track
+        
+        tracks = results.tracks if isinstance(results, wavelink.TrackPlaylist) else results
+        fresh = next((t for t in tracks if t.identifier == track.identifier), tracks[0])
+        return self.registry.intern(fresh) if self.registry is not None else fresh
+    
+    # gap measuring
+    def track_stopped(self):
+        self._stopped_at = time.perf_counter()
+        
+    def track_started(self):  # returns seconds since previous track ended (None if nothing ended)
+        self.schedule_prefetch()
+        
+        if self._stopped_at is None:
+            return None
+        
+        gap, self._stopped_at = time.perf_counter() - self._stopped_at, None
+        return gap
         
     async def repeat_track(self):
         await self.play(self.queue.current_track)
         
+    async def jump(self, steps):  # next (+1) and previous (-1), presses right after a skip merge into one more
+        if self._jump is not None:
+            self._jump += steps
+            return False
+        
+        self._jump = 0
+        try:
+            await self._move(steps)
+        finally:
+            self.bot.loop.create_task(self._merge_jumps())
+        return True
+        
+    async def _merge_jumps(self):  # presses gathered during the window are applied as one skip
+        try:
+            while True:
+                await asyncio.sleep(cfg.admission["merge_window"])
+                steps, self._jump = self._jump, 0
+                if not steps:
+                    break
+                await self._move(steps)
+        except Exception as exc:
+            print(f"Merged skip failed for {self.guild_id}: {exc}")
+        finally:
+            self._jump = None
+        
+    async def _move(self, steps):
+        if self.queue.is_empty:
+            return
+        
+        steps = max(min(steps, len(self.queue.upcoming)), -len(self.queue.history))
+        if not steps:
+            return
+        
+        if steps != 1:
+            self.queue.rewind(1 - steps)  # stop() advances by one
+        await self.stop()
+        
         
 class Music(commands.Cog, wavelink.WavelinkMixin):
     def __init__(self, bot):
         self.bot = bot
         self.wavelink = wavelink.Client(bot=bot)
-        self.bot.loop.create_task(self.start_nodes())
+        if runtime.dumps is not None:
+            self.wavelink.set_serializer(runtime.dumps)
+        self.track_registry = TrackRegistry()  # one track object per lavalink track across all guilds
+        self.search_cache = SearchCache(**{**cfg.search_cache, "path": self.cluster_path(cfg.search_cache["path"])}, registry=self.track_registry)
+        self.node_pool = NodePool(self.wavelink, cfg.nodes, **cfg.node_pool)
+        self.resolver = TrackResolver(self.node_pool, **cfg.resolver)  # deduplicated, bounded lavalink searches
+        self.track_gaps = deque(maxlen=cfg.prefetch["gap_samples"])  # seconds between track end and next start
+        self.picker_ready = deque(maxlen=cfg.picker["samples"])  # seconds until a track picker took picks
+        self.picker_buttons = deque(maxlen=cfg.picker["samples"])  # seconds until all its reactions were added
+        self.outbox = Outbox(**cfg.outbox)  # status embeds, coalesced per channel
+        self.locales = Locales(
+            "bot.data.langs", cfg.locales["default"], cfg.locales["guilds"], (colour_info, colour_error), self.cluster_path(cfg.locales["path"])
+        )
+        self.reaper = IdleReaper(self.reap, cfg.idle)  # disconnects players left alone
+        self.journal = QueueJournal(**{**cfg.state, "path": self.cluster_path(cfg.state["path"])}, registry=self.track_registry)
+        self.restored = {}  # guild id -> PlayerState waiting to be reconnected, loaded on startup
+        self.admission = Admission(cfg.admission["user"], cfg.admission["guild"], cfg.admission["searches"], cfg.admission["costs"])
+        self.history = PlayHistory(**{**cfg.history, "path": self.cluster_path(cfg.history["path"])}, registry=self.track_registry)
+        self.ready = asyncio.Event()  # set once state is loaded, nodes are up and players are restored
+        self._compact_task = None
+        self.register_metrics()
+        self.bot.loop.create_task(self.startup())
+        
+    def cluster_path(self, path):  # every cluster worker keeps its own state files
+        if path is None or (cluster_id := getattr(self.bot, "cluster_id", None)) is None:
+            return path
+        
+        path = Path(path)
+        return path.with_name(f"{path.stem}.{cluster_id}{path.suffix}")
+        
+    def register_metrics(self):  # gauges are read on scrape, only timings are recorded as they happen
+        metrics = self.bot.metrics
+        self.get_tracks_latency = metrics.histogram("senpy_get_tracks_seconds", "Lavalink track loading time.", ("kind",))
+        self.gap_latency = metrics.histogram("senpy_track_gap_seconds", "Silence between a track end and the next start.")
+        self._gauges = [
+            metrics.gauge("senpy_players", "Connected players.", lambda: len(self.players)),
+            metrics.gauge("senpy_players_playing", "Players with a track loaded.", lambda: sum(p.is_playing for p in self.players)),
+            metrics.gauge(
+                "senpy_queue_tracks", "Upcoming tracks in all queues.",
+                lambda: sum(len(p.queue.upcoming) for p in self.players if not p.queue.is_empty),
+            ),
+            metrics.gauge(
+                "senpy_node_available", "Lavalink node connection state.",
+                lambda: {(i,): int(n.is_available) for i, n in self.node_pool.nodes.items()}, ("node",),
+            ),
+            metrics.gauge(
+                "senpy_node_players", "Players per lavalink node.",
+                lambda: {(i,): len(n.players) for i, n in self.node_pool.nodes.items()}, ("node",),
+            ),
+            metrics.gauge("senpy_node_reconnects", "Lavalink listener restarts.", lambda: self.node_pool.reconnects),
+            metrics.gauge("senpy_node_migrated_players", "Players moved off failed nodes.", lambda: self.node_pool.migrated),
+            metrics.gauge(
+                "senpy_search_cache", "Search cache hits, misses and entries.",
+                lambda: {(k,): v for k, v in self.search_cache.stats.items() if k != "hit_ratio"}, ("stat",),
+            ),
+            metrics.gauge(
+                "senpy_lavalink_requests", "Track lookups: in flight, sent, shared with one in flight, retried and failed.",
+                lambda: {(k,): v for k, v in self.resolver.stats.items() if not k.startswith("wait")}, ("stat",),
+            ),
+            metrics.gauge(
+                "senpy_lavalink_queue_wait_seconds", "Seconds lookups waited for a free node slot (recent p50, p99, max).",
+                lambda: {(k[5:],): v for k, v in self.resolver.stats.items() if k.startswith("wait")}, ("quantile",),
+            ),
+            metrics.gauge(
+                "senpy_admission", "Commands refused by user or guild budget, searches refused, merged skips and live buckets.",
+                lambda: {(k,): v for k, v in self.admission.stats.items()}, ("event",),
+            ),
+            metrics.gauge(
+                "senpy_shared_tracks", "Interned tracks in memory, hits and tracks created.",
+                lambda: {(k,): v for k, v in self.track_registry.stats.items()}, ("stat",),
+            ),
+            metrics.gauge("senpy_idle_pending", "Scheduled idle player disconnects.", lambda: len(self.reaper)),
+            metrics.gauge(
+                "senpy_idle_reclaimed", "Idle players disconnected by reason.",
+                lambda: {(r,): self.reaper.reclaimed[r] for r in self.reaper.timeouts}, ("reason",),
+            ),
+            metrics.gauge("senpy_outbox_depth", "Status embeds waiting to be sent.", lambda: self.outbox.depth),
+            metrics.gauge(
+                "senpy_outbox", "Status embed delivery counts.",
+                lambda: {(k,): self.outbox.stats[k] for k in ("sent", "edited", "coalesced", "dropped", "failed")}, ("stat",),
+            ),
+        ]
+        
+    def cog_unload(self):
+        self.node_pool.close()
+        self.bot.loop.create_task(self.resolver.close())
+        if self._compact_task is not None:
+            self._compact_task.cancel()
+        self.journal.compact_now(self.player_states())  # players resume after restart
+        self.journal.close()
+        self.search_cache.save()  # keep cached searches across restarts
+        self.outbox.close()
+        self.reaper.close()
+        self.history.close()
+        self.bot.metrics.unregister(
+            self.get_tracks_latency.name, self.gap_latency.name, *(gauge.name for gauge in self._gauges)
+        )
         
-    @commands.Cog.listener() # checking for member left
+    @commands.Cog.listener() # checking for members leaving or joining the player's channel
     async def on_voice_state_update(self, member, before, after):
-        if not member.bot and after.channel is None:
-            if not [m for m in before.channel.members if not m.bot]:
-                pass
-                # set delay before leaving if there's no member in voice channel
+        if before.channel == after.channel or (player := self.node_pool.find_player(member.guild.id)) is None:
+            return
+        
+        if member.id == self.bot.user.id and after.channel is None:  # kicked or disconnected, not by p_disconnect
+            self.reaper.cancel(member.guild.id)
+            await player.p_disconnect()  # frees the lavalink player and closes the journal entry
+        elif player.channel_id in (getattr(before.channel, "id", None), getattr(after.channel, "id", None)):
+            self.check_empty(player)
+            
+    def check_empty(self, player):  # schedules or cancels the disconnect of a player without listeners
+        channel = self.bot.get_channel(player.channel_id)
+        if channel is not None and not [m for m in channel.members if not m.bot]:
+            self.reaper.schedule(player.guild_id, "empty")
+        else:
+            self.reaper.cancel(player.guild_id, "empty")
+            
+    async def reap(self, guild_id, reason):  # called by the reaper when a player stayed idle for too long
+        if (player := self.node_pool.find_player(guild_id)) is None or not player.is_connected:
+            return False
+        
+        if reason == "paused" and not player.is_paused:
+            return False
+        if reason == "finished" and player.is_playing:
+            return False
+        
+        await player.p_disconnect()
+        print(f"Disconnected idle player {guild_id} ({reason}).")
+        return True
     
     @wavelink.WavelinkMixin.listener()
     async def on_node_ready(self, node):
-        print(f"Wavelink is now connected {node.identifier}")  # connected wavelink to the node MAIN
+        print(f"Wavelink is now connected {node.identifier}")  # connected wavelink to the node
+        
+    @wavelink.WavelinkMixin.listener()
+    async def on_track_start(self, node, payload):
+        if (gap := payload.player.track_started()) is not None:
+            self.track_gaps.append(gap)
+            self.gap_latency.observe(gap)
+        self.reaper.cancel(payload.player.guild_id, "finished")
+        if payload.player.resumed(payload.track):  # same play going on, not another one
+            return
+        if (track := payload.player.current) is not None:  # `previous` moves the queue before the end event
+            self.history.record(payload.player.guild_id, track)
+            
+    @commands.Cog.listener()
+    async def on_picker_ready(self, ready, buttons):
+        self.picker_ready.append(ready)
+        if buttons is not None:
+            self.picker_buttons.append(buttons)
         
     @wavelink.WavelinkMixin.listener("on_track_stuck")
     @wavelink.WavelinkMixin.listener("on_track_end")
     @wavelink.WavelinkMixin.listener("on_track_exception")
     async def on_player_stop(self, node, payload):  # player stop errors handling
+        if getattr(payload, "reason", None) == "REPLACED":  # we started the next track ourselves (stuck track)
+            return
+        
+        payload.player.track_stopped()
+        
         if payload.player.queue.repeat_mode == RepeatMode.ONE:
             await payload.player.repeat_track()
-        else:
-            await payload.player.advance()
+        elif await payload.player.advance() is None:
+            self.reaper.schedule(payload.player.guild_id, "finished")
         
     async def cog_check(self, ctx):  # it will check every commands in the cog
         if isinstance(ctx.channel, discord.DMChannel):
-            embed = discord.Embed(title=f"{mp['dm_error']}", colour=colour_error)
-            await ctx.send(embed=embed)
+            self.notify(ctx, "dm_error")
             return False
         
         return True
     
-    async def start_nodes(self):
+    async def startup(self):  # state files load while the gateway connects, wavelink needs the bot ready
+        with self.bot.phase("state"):
+            try:
+                await self.bot.loop.run_in_executor(None, self.load_state)
+            except Exception as exc:  # bad state files shouldn't keep nodes down and commands on hold
+                print(f"Could not load saved state, starting without it: {exc!r}")
+        
         await self.bot.wait_until_ready()
+        with self.bot.phase("nodes"):
+            await self.node_pool.connect()  # nodes are defined in data/config.py
+        self.reaper.start()
+        self.history.start(self.bot.loop)
         
-        nodes = {
-            "MAIN": {
-                "host": "127.0.0.1",
-                "port": 2333,
-                "rest_uri": "http://127.0.0.1:2333",
-                "password": "youshallnotpass",
-                "identifier": "MAIN",
-                "region": "europe",
-            }
-        }
+        with self.bot.phase("restore"):
+            await self.restore_players()
+        self.ready.set()
+        self.bot.report_startup()
+        self._compact_task = self.bot.loop.create_task(self.compact_journal())
         
-        for node in nodes.values():
-            await self.wavelink.initiate_node(**node)
+    def load_state(self):  # runs in a thread, nothing uses the cache or the journal before ready
+        steps = (
+            ("language packs", self.validate_locales),
+            ("guild languages", self.locales.load),
+            ("search cache", self.search_cache.load),
+            ("play history", self.history.load),
+            ("player state", self.load_journal),
+        )
+        for name, load in steps:  # one broken file only costs its own state
+            try:
+                load()
+            except Exception as exc:
+                print(f"Could not load {name}: {exc!r}")
+        
+    def validate_locales(self):
+        used = used_keys(sys.modules[__name__], sys.modules[QueuePages.__module__])  # keys and values the code passes
+        for code, problems in self.locales.validate(used).items():
+            print(f"Language pack {code}: " + ", ".join(problems))
+        
+    def load_journal(self):
+        try:
+            self.restored = self.journal.load(Queue)
+        except Exception:
+            self.journal.open()  # keep appending, compacting now would replace the unreadable journal
+            raise
+        self.journal.compact_now(self.restored)
+        
+    async def cog_before_invoke(self, ctx):  # commands sent during startup wait for it instead of failing
+        if not self.ready.is_set():
+            try:
+                await asyncio.wait_for(self.ready.wait(), cfg.startup["hold_timeout"])
+            except asyncio.TimeoutError:
+                pass
+        
+        if ctx.guild is not None and not ctx.command.hidden:  # owner commands aren't budgeted
+            if retry_after := self.admission.admit(ctx.guild.id, ctx.author.id, ctx.command.name):
+                raise Throttled(retry_after)
+        
+    async def cog_command_error(self, ctx, exc):
+        if isinstance(exc, Throttled):
+            self.notify(ctx, "throttled_error", seconds=max(1, math.ceil(exc.retry_after)))
+        elif isinstance(exc, TooManySearches):
+            self.notify(ctx, "too_many_searches_error")
+        elif not isinstance(exc, HANDLED_ERRORS) and not self._unknown_language(ctx, exc):
+            # overriding cog_command_error turns off discord.py's default printing for the whole cog
+            print(f"Ignoring exception in command {ctx.command}:", file=sys.stderr)
+            traceback.print_exception(type(exc), exc, exc.__traceback__, file=sys.stderr)
+            
+    @staticmethod
+    def _unknown_language(ctx, exc):  # answered by language_command_error
+        return ctx.command is not None and ctx.command.name == "language" and isinstance(getattr(exc, "original", None), KeyError)
+        
+    async def get_tracks(self, route, guild_id=None):  # cached wavelink search for a routed query
+        if route.kind == QueryKind.YOUTUBE_VIDEO and (track := self.search_cache.get_track(route.identifier)):
+            return [track]  # video already seen in some result, no lavalink round trip
+        
+        if (tracks := self.search_cache.get(route.query)) is None:
+            if not self.admission.start_search(guild_id):
+                raise TooManySearches
+            
+            try:
+                started = time.perf_counter()
+                tracks = self.track_registry.intern_result(await self.resolver.get_tracks(route.query))
+                self.get_tracks_latency.observe(time.perf_counter() - started, (route.kind.name,))
+            finally:
+                self.admission.end_search(guild_id)
+            self.search_cache.put(route.query, tracks)
+        
+        return tracks
         
     def get_player(self, obj):
         if isinstance(obj, commands.Context):
-            return self.wavelink.get_player(obj.guild.id, cls=Player, context=obj)
+            return self.node_pool.get_player(obj.guild.id, cls=Player, journal=self.journal, outbox=self.outbox, locales=self.locales, registry=self.track_registry, context=obj)
         
         elif isinstance(obj, discord.Guild):
-            return self.wavelink.get_player(obj.id, cls=Player)
+            return self.node_pool.get_player(obj.id, cls=Player, journal=self.journal, outbox=self.outbox, locales=self.locales, registry=self.track_registry)
+        
+    def locale(self, ctx):
+        return self.locales.for_guild(ctx.guild.id if ctx.guild else None)
+        
+    def notify(self, ctx, key, **values):  # localized status embed, coalesced per channel
+        self.outbox.post(ctx.channel, self.locale(ctx).embed(key, **values))
+        
+    @property
+    def players(self):
+        return [p for node in self.wavelink.nodes.values() for p in node.players.values()]
+    
+    def player_states(self):  # states to persist, players not restored yet are kept as loaded
+        states = dict(self.restored)
+        states.update((p.guild_id, p.state) for p in self.players if not p.queue.is_empty)
+        return states
+    
+    async def restore_players(self):  # reconnect every journaled player in parallel
+        if not self.restored:
+            return
+        
+        start = time.perf_counter()
+        results = await asyncio.gather(*(self.restore_player(g) for g in list(self.restored)), return_exceptions=True)
+        
+        for exc in (r for r in results if isinstance(r, Exception)):
+            print(f"Could not restore player: {exc}")
+        print(f"Restored {results.count(True)}/{len(results)} players in {time.perf_counter() - start:.2f}s")
+        
+    async def restore_player(self, guild_id):
+        state = self.restored.pop(guild_id)
+        
+        if (guild := self.bot.get_guild(guild_id)) is None or state.channel_id is None:
+            return False
+        
+        if guild.get_channel(state.channel_id) is None or state.queue.is_empty or state.queue.current_track is None:
+            return False  # connected but nothing queued (or finished), there is nothing to resume
+        
+        if not await (player := self.get_player(guild)).restore(state):
+            return False
+        self.check_empty(player)
+        if player.is_paused:
+            self.reaper.schedule(guild_id, "paused")
+        return True
+    
+    async def compact_journal(self):
+        while True:
+            await asyncio.sleep(self.journal.compact_interval)
+            try:
+                await self.journal.compact(self.player_states(), self.bot.loop)
+            except Exception as exc:
+                print(f"Journal compaction failed: {exc}")
         
     # commands
     @commands.command(name="connect", aliases=['join'])
@@ -301,25 +984,22 @@ class Music(commands.Cog, wavelink.WavelinkMixin):
         # if no channel defined bot will join user's channel
         player = self.get_player(ctx)
         channel = await player.connect(ctx, channel)
-        embed = discord.Embed(title=f"{mp['connected_to']} {channel.name}.", colour=colour_info)
-        await ctx.send(embed=embed)
+        self.notify(ctx, "connected_to", channel=channel.name)
         
     @connect.error
     async def connect_command_error(self, ctx, exc):
         if isinstance(exc, AlreadyConnectedToChannel):
-            embed = discord.Embed(title=f"{mp['already_connected_error']}", colour=colour_error)
-            await ctx.send(embed=embed)
+            self.notify(ctx, "already_connected_error")
         elif isinstance(exc, NoVoiceChannel):
-            embed = discord.Embed(title=f"{mp['no_voice_channel_error']}", colour=colour_error)
-            await ctx.send(embed=embed)
+            self.notify(ctx, "no_voice_channel_error")
             
     @commands.command(name="disconnect", aliases=['leave'])
     async def disconnect(self, ctx):
         player = self.get_player(ctx)
+        self.reaper.cancel(ctx.guild.id)
         await player.p_disconnect()
         
-        embed=discord.Embed(title=f"{mp['disconnect_from']}", colour=colour_info)
-        await ctx.send(embed=embed)
+        self.notify(ctx, "disconnected_from")
         
     @commands.command(name="play", aliases=['p'])
     async def play(self, ctx, *, query: t.Optional[str]): # with optional no need to add resume command
@@ -333,24 +1013,21 @@ class Music(commands.Cog, wavelink.WavelinkMixin):
                 raise QueueIsEmpty
             
             await player.set_pause(False)
-            embed = discord.Embed(title=f"{mp['resumed']}", colour=colour_info)
-            await ctx.send(embed=embed)
+            self.reaper.cancel(ctx.guild.id, "paused")
+            self.notify(ctx, "resumed")
         
         else:
             query = query.strip("<>")  # prevent stopping embed creating
             if not query == "":
-                if not re.match(URL_REGEX, query):
-                    query = f"ytsearch:{query}"
-                
-                await player.add_tracks(ctx, await self.wavelink.get_tracks(query))  # wavelink finding the song
+                route = route_query(query)  # search or canonical url
+                await player.add_tracks(ctx, await self.get_tracks(route, ctx.guild.id))  # wavelink finding the song
             else:
                 pass   
             
     @play.error
     async def play_command_error(self, ctx, exc):
         if isinstance(exc, QueueIsEmpty):
-            embed = discord.Embed(title=f"{mp['queue_empty_error']}", colour=colour_error)
-            await ctx.send(embed=embed)
+            self.notify(ctx, "empty_queue_error")
 
     @commands.command(name="pause")
     async def pause(self, ctx):
@@ -360,22 +1037,21 @@ class Music(commands.Cog, wavelink.WavelinkMixin):
             raise PlayerIsAlreadyPaused
         
         await player.set_pause(True)
-        embed = discord.Embed(title=f"{mp['paused']}", colour=colour_info)
-        await ctx.send(embed=embed)
+        self.reaper.schedule(ctx.guild.id, "paused")
+        self.notify(ctx, "paused")
         
     @pause.error
     async def pause_command_error(self, ctx, exc):
         if isinstance(exc, PlayerIsAlreadyPaused):
-            embed=discord.Embed(title=f"{mp['already_paused_error']}", colour=colour_error)
-            await ctx.send(embed=embed)
+            self.notify(ctx, "already_paused_error")
     
     @commands.command(name="stop")
     async def stop(self, ctx):
         player = self.get_player(ctx)
+        player.cancel_ingest()
         player.queue.empty()
         await player.stop()
-        embed = discord.Embed(title=f"{mp['stopped']}", colour=colour_info)
-        await ctx.send(embed=embed)
+        self.notify(ctx, "stopped")
         
     @commands.command("next", aliases=['skip', 'forceskip', 'fs', 'n'])
     async def next(self, ctx):
@@ -384,18 +1060,17 @@ class Music(commands.Cog, wavelink.WavelinkMixin):
         if not player.queue.upcoming:
             raise NoMoreTracks
 
-        await player.stop()
-        embed=discord.Embed(title=f"{mp['skipped']}", colour=colour_info)
-        await ctx.send(embed=embed)
+        if not await player.jump(1):  # merged into a skip already taking effect
+            self.admission.counters["merged"] += 1
+            return
+        self.notify(ctx, "skipped")
         
     @next.error
     async def next_command_error(self, ctx, exc):
         if isinstance(exc, QueueIsEmpty):
-            embed = discord.Embed(title=f"{mp['queue_empty_error']}", colour=colour_error)
-            await ctx.send(embed=embed)
+            self.notify(ctx, "empty_queue_error")
         elif isinstance(exc, NoMoreTracks):
-            embed = discord.Embed(title=f"{mp['no_more_tracks_error']}", colour=colour_error)
-            await ctx.send(embed=embed)
+            self.notify(ctx, "no_more_tracks_error")
             
     @commands.command("previous", aliases=['prev'])
     async def previous(self, ctx):
@@ -404,32 +1079,28 @@ class Music(commands.Cog, wavelink.WavelinkMixin):
         if not player.queue.history:
             raise NoPreviousTracks
 
-        player.queue.position -= 2
-        await player.stop()
-        embed=discord.Embed(title=f"{mp['previous']}", colour=colour_info)
-        await ctx.send(embed=embed)
+        if not await player.jump(-1):
+            self.admission.counters["merged"] += 1
+            return
+        self.notify(ctx, "previous")
         
     @previous.error
     async def previous_command_error(self, ctx, exc):
         if isinstance(exc, QueueIsEmpty):
-            embed = discord.Embed(title=f"{mp['queue_empty_error']}", colour=colour_error)
-            await ctx.send(embed=embed)
+            self.notify(ctx, "empty_queue_error")
         elif isinstance(exc, NoPreviousTracks):
-            embed = discord.Embed(title=f"{mp['no_previous_tracks_error']}", colour=colour_error)
-            await ctx.send(embed=embed)
+            self.notify(ctx, "no_previous_tracks_error")
             
     @commands.command(name="shuffle")
     async def shuffle(self, ctx):
         player = self.get_player(ctx)
         player.queue.shuffle()
-        embed=discord.Embed(title=f"{mp['shuffled']}", colour=colour_info)
-        await ctx.send(embed=embed)
+        self.notify(ctx, "shuffled")
         
     @shuffle.error
     async def shuffle_command_error(self, ctx, exc):
         if isinstance(exc, QueueIsEmpty):
-            embed=discord.Embed(title=f"{mp['queue_empty_error']}", colour=colour_error)
-            await ctx.send(embed=embed)
+            self.notify(ctx, "empty_queue_error")
             
     @commands.command(name="repeat", aliases=['loop'])
     async def repeat(self, ctx, mode: str):
@@ -438,42 +1109,172 @@ class Music(commands.Cog, wavelink.WavelinkMixin):
         
         player = self.get_player(ctx)
         player.queue.set_repeat_mode(mode)
-        embed=discord.Embed(title=f"{mp['repeat_mode']} {mode}.", colour=colour_info)
-        await ctx.send(embed=embed)
+        if mode == "all" and player.queue.released:  # the oldest tracks are gone, say what will loop
+            self.notify(ctx, "repeat_all_partial", count=player.queue.length, released=player.queue.released)
+        else:
+            self.notify(ctx, "repeat_mode", mode=mode)
 
     @commands.command(name="queue", aliases=['q'])
-    async def queue(self, ctx, show: t.Optional[int] = 10):
+    async def queue(self, ctx, page: t.Optional[int] = 1):
         player = self.get_player(ctx)
         
         if player.queue.is_empty:
             raise QueueIsEmpty
         
-        embed = discord.Embed(
-            title=f"{mp['q_title']}",
-            description=f"{mp['q_description']}",
-            colour=ctx.author.colour,
-            timestamp=dt.datetime.utcnow()
-        )
-        embed.set_author(name="")
-        embed.set_footer(text=f"{mp['invoke']} {ctx.author.display_name}", icon_url=ctx.author.avatar_url)
-        embed.add_field(name=f"{mp['q_current']}", 
-                        value=player.queue.current_track.title,
-                        inline=False
-                        )
-        if upcoming := player.queue.upcoming:
-            embed.add_field(
-                name=f"{mp['q_next']}",
-                value="\n".join(t.title for t in upcoming[:show]),
-                inline=False,
+        page = min(max(page - 1, 0), player.pages.count(player.queue) - 1)
+        msg = await ctx.send(embed=player.pages.embed(player, page, ctx.author, self.locale(ctx)))
+        if player.pages.count(player.queue) >= 2:  # the command is done once the page is out, navigation runs on its own
+            self.bot.loop.create_task(self.navigate_queue(ctx, player, msg, page))
+        
+    async def navigate_queue(self, ctx, player, msg, page):
+        def _check(r, u):
+            return (
+                r.emoji in PAGE_BUTTONS.keys()
+                and u == ctx.author
+                and r.message.id == msg.id
             )
-
-        await ctx.send(embed=embed)
+        
+        try:
+            for emoji in PAGE_BUTTONS.keys():
+                await msg.add_reaction(emoji)
+        except discord.HTTPException:  # page deleted or missing permissions, nothing to navigate with
+            return
+        
+        while True:  # navigation edits the same message
+            try:
+                reaction, user = await self.bot.wait_for("reaction_add", timeout=cfg.queue["page_timeout"], check=_check)
+            except asyncio.TimeoutError:
+                try:
+                    await msg.clear_reactions()
+                except discord.HTTPException:  # missing manage messages permission
+                    pass
+                break
+            
+            if player.queue.is_empty:  # cleared meanwhile, the page stays as it was
+                continue
+            
+            page = (page + PAGE_BUTTONS[reaction.emoji]) % player.pages.count(player.queue)
+            try:
+                await msg.edit(embed=player.pages.embed(player, page, ctx.author, self.locale(ctx)))
+            except discord.HTTPException:  # page deleted
+                break
+            try:
+                await msg.remove_reaction(reaction.emoji, user)
+            except discord.HTTPException:
+                pass
         
     @queue.error
     async def queue_command_error(self, ctx, exc):
         if isinstance(exc, QueueIsEmpty):
-            embed=discord.Embed(title=f"{mp['queue_empty_error']}", colour=colour_error)
-            await ctx.send(embed=embed)
+            self.notify(ctx, "empty_queue_error")
+        
+    @commands.command(name="language", aliases=['lang'])
+    async def language(self, ctx, *, code: t.Optional[str] = None):
+        if code is None:
+            return self.notify(ctx, "language", code=self.locale(ctx).code, available=", ".join(self.locales.available))
+        
+        if not ctx.author.guild_permissions.manage_guild:
+            raise commands.MissingPermissions(["manage_guild"])
+        
+        self.locales.set_guild(ctx.guild.id, code.lower())
+        self.locales.save()
+        self.notify(ctx, "language_set", code=code.lower())
+        
+    @language.error
+    async def language_command_error(self, ctx, exc):
+        if isinstance(getattr(exc, "original", None), KeyError):  # no such language pack
+            self.notify(ctx, "unknown_language_error", code=ctx.kwargs.get("code"))
+        elif isinstance(exc, commands.MissingPermissions):  # only managers change the guild language
+            self.notify(ctx, "missing_permissions_error")
+        
+    @commands.command(name="history")
+    async def history_command(self, ctx, count: t.Optional[int] = 10):  # latest plays in this guild
+        if not (plays := self.history.recently_played(ctx.guild.id, min(max(count, 1), self.history.recent))):
+            return self.notify(ctx, "no_history")
+        
+        embed = discord.Embed(
+            title=self.locale(ctx).text("history_title"),
+            description="\n".join(f"**{i}.** {track.title} (<t:{at}:R>)" for i, (track, at) in enumerate(plays, 1)),
+            colour=colour_info,
+        )
+        await ctx.send(embed=embed)
+        
+    @commands.command(name="stats")
+    async def stats_command(self, ctx):  # most played tracks and totals of this guild
+        if not (top := self.history.most_played(ctx.guild.id, self.history.top_size)):
+            return self.notify(ctx, "no_history")
+        
+        locale = self.locale(ctx)
+        summary = self.history.summary(ctx.guild.id)
+        embed = discord.Embed(
+            title=locale.text("stats_title"),
+            description=locale.text(
+                "stats_description", plays=summary["plays"], tracks=summary["tracks"],
+                duration=format_duration(summary["played_ms"]),
+            ),
+            colour=colour_info,
+        )
+        embed.add_field(
+            name="\u200b",
+            value="\n".join(
+                f"**{i}.** {track.title} ({locale.text('stats_plays', plays=plays)})" for i, (track, plays) in enumerate(top, 1)
+            ),
+            inline=False,
+        )
+        await ctx.send(embed=embed)
+        
+    @commands.command(name="gaps", hidden=True)
+    @commands.is_owner()
+    async def gaps(self, ctx):  # measured silence between tracks
+        if not (gaps := sorted(self.track_gaps)):
+            return await ctx.send(embed=self.locale(ctx).embed("no_gaps"))
+        
+        embed = discord.Embed(title=self.locale(ctx).text("gaps_title"), description=summarize(gaps), colour=colour_info)
+        await ctx.send(embed=embed)
+        
+    @commands.command(name="picker", hidden=True)
+    @commands.is_owner()
+    async def picker(self, ctx):  # measured time until track pickers were usable
+        if not (ready := sorted(self.picker_ready)):
+            return await ctx.send(embed=self.locale(ctx).embed("no_picker"))
+        
+        locale = self.locale(ctx)
+        embed = locale.embed("picker_title")
+        embed.add_field(name=locale.text("picker_ready"), value=summarize(ready), inline=False)
+        if buttons := sorted(self.picker_buttons):
+            embed.add_field(name=locale.text("picker_buttons"), value=summarize(buttons), inline=False)
+        await ctx.send(embed=embed)
+        
+    @commands.command(name="outbox", hidden=True)
+    @commands.is_owner()
+    async def outbox_stats(self, ctx):  # status embeds queue depth and delivery
+        stats = self.outbox.stats
+        embed = discord.Embed(
+            title=self.locale(ctx).text("outbox_title"),
+            description=(
+                f"queued {stats['depth']} in {stats['channels']} channels | sent {stats['sent']} | "
+                f"edited {stats['edited']} | coalesced {stats['coalesced']} | dropped {stats['dropped']} | "
+                f"failed {stats['failed']}\n"
+                f"latency p50 {1000*stats['latency_p50']:.0f} ms | max {1000*stats['latency_max']:.0f} ms"
+            ),
+            colour=colour_info,
+        )
+        await ctx.send(embed=embed)
+        
+    @commands.command(name="profile", hidden=True)
+    @commands.is_owner()
+    async def profile(self, ctx, seconds: t.Optional[int] = None):  # what the event loop is busy with
+        seconds = min(seconds or cfg.profiler["seconds"], cfg.profiler["max_seconds"])
+        if (report := await self.bot.profiler.run(seconds)) is None:
+            return await ctx.send(embed=self.locale(ctx).embed("profile_busy"))
+        
+        embed = discord.Embed(
+            title=self.locale(ctx).text("profile_title"),
+            description="```\n" + "\n".join(line[:120] for line in report.summary) + "\n```",
+            colour=colour_info,
+        )
+        embed.set_footer(text=f"{report.path}")
+        await ctx.send(embed=embed)
         
     
 def setup(bot):  # adding music class as cog
@@ -0,0 +1,151 @@
+# bot configuration
+import os
+
+# cluster mode, more than one worker splits the shards across processes
+cluster = {
+    "workers": int(os.environ.get("SENPY_WORKERS", 1)),  # worker processes
+    "shard_count": None,  # total shards (None asks discord for the recommended count)
+    "health_interval": 15,  # seconds between worker heartbeats and supervisor reports
+    "heartbeat_timeout": 90,  # seconds without heartbeat before a worker is restarted
+}
+
+# runtime profile: "fast" runs on uvloop and decodes payloads with orjson when they are installed
+runtime = {
+    "profile": os.environ.get("SENPY_RUNTIME", "default"),  # "default" or "fast"
+}
+
+# startup
+startup = {
+    "hold_timeout": 30,  # seconds music commands sent during startup wait for nodes and restored players
+}
+
+# command prefixes (mentioning the bot always works too)
+bot = {
+    "prefixes": ["`"],
+    "guild_prefixes": {},  # guild id -> list of prefixes replacing the default ones
+}
+
+# prometheus style /metrics endpoint (local only)
+metrics = {
+    "enabled": True,
+    "host": "127.0.0.1",
+    "port": 9100,  # cluster workers use port + cluster id
+    "lag_interval": 0.5,  # seconds between event loop lag samples
+}
+
+# on demand profiling (`profile` command or the signal)
+profiler = {
+    "seconds": 10,  # default profile length
+    "max_seconds": 120,
+    "signal": "SIGUSR1",  # None disables the signal handler
+    "report": {
+        "path": "./bot/data/profiles",  # reports (.txt) and raw cProfile stats (.prof)
+        "slow_callback": 0.1,  # seconds a callback may block the event loop before it's reported
+    },
+}
+
+# message languages (bot/data/langs/<code>.py)
+locales = {
+    "default": "en",
+    "guilds": {},  # guild id -> language code replacing the default one
+    "path": "./bot/data/guild_languages.json",  # languages set with the `language` command (None keeps them in memory only)
+}
+
+# lavalink nodes, new players are placed on the least loaded available node
+nodes = {
+    "MAIN": {
+        "host": "127.0.0.1",
+        "port": 2333,
+        "rest_uri": "http://127.0.0.1:2333",
+        "password": "youshallnotpass",
+        "identifier": "MAIN",
+        "region": "europe",
+    },
+}
+
+node_pool = {
+    "health_interval": 5,  # seconds between node health checks
+    "failover_after": 10,  # seconds a node has to be down before its players are moved
+}
+
+# lavalink track loading
+resolver = {
+    "max_in_flight": 8,  # concurrent /loadtracks requests per node, the rest queue up
+    "retries": 3,  # retries after a failed request, with jittered exponential backoff
+    "backoff": 0.5,  # base seconds between retries
+    "timeout": 10,  # seconds a request may take
+    "samples": 1000,  # recent queue waits kept for the stats
+}
+
+# search result cache in front of wavelink.get_tracks
+search_cache = {
+    "max_size": 2048,  # max cached queries (least recently used are evicted first)
+    "ttl": 6 * 60 * 60,  # seconds before cached result expires
+    "path": "./bot/data/search_cache.json",  # persistence file (None to keep cache in memory only)
+}
+
+# player queue
+queue = {
+    "max_history": 500,  # played tracks kept for `previous` (None keeps all of them)
+    "page_size": 10,  # tracks per page in the `queue` command
+    "page_timeout": 60,  # seconds the queue pages react to navigation
+}
+
+# next track prefetching
+prefetch = {
+    "lead": 10,  # seconds before current track ends to prepare the next one
+    "refresh": True,  # reload a next track read back from the cache or journal files from its URI
+    "gap_samples": 1000,  # recent inter-track gaps kept for the `gaps` command
+}
+
+# track picker (play with search results)
+picker = {
+    "timeout": 60,  # seconds to wait for a pick
+    "samples": 1000,  # recent time to interactive samples kept for the `picker` command
+}
+
+# playlists queued in the background
+playlist = {
+    "page_size": 100,  # tracks added to the queue at once
+    "progress_interval": 2,  # seconds between progress message edits
+}
+
+# seconds before idle players are disconnected
+idle = {
+    "empty": 60,  # nobody but bots left in the voice channel
+    "paused": 600,  # paused
+    "finished": 300,  # queue played to the end or stopped
+}
+
+# outbound status embeds (coalesced per channel)
+outbox = {
+    "edit_window": 10,  # seconds the last notice message is edited instead of sending a new one
+    "max_age": 15,  # seconds after which an unsent notice is dropped
+    "max_lines": 10,  # notices per message
+    "rate": 5,  # messages per `per` seconds and channel (discord channel limit)
+    "per": 5,
+    "samples": 1000,  # recent delivery latencies kept for the `outbox` command
+}
+
+# command admission control, idle users and guilds aren't tracked
+admission = {
+    "user": (5, 10),  # commands a user may run in a burst, refilled over that many seconds
+    "guild": (20, 10),  # same for a whole guild
+    "searches": 2,  # track searches running at once per guild
+    "costs": {"play": 2, "queue": 2},  # tokens per command, other commands cost 1 and 0 is free
+    "merge_window": 0.5,  # seconds next/previous presses after a skip are merged into one more skip
+}
+
+# what was played, for the `history` and `stats` commands
+history = {
+    "path": "./bot/data/play_history.log",  # append-only play log, tracks go next to it in .tracks (None keeps it in memory)
+    "recent": 100,  # latest plays kept per guild
+    "top": 10,  # most played tracks kept per guild
+    "flush_interval": 5,  # seconds plays are buffered before being written
+}
+
+# crash safe player state (queue journal)
+state = {
+    "path": "./bot/data/player_state.journal",  # append-only journal of queue changes
+    "compact_interval": 300,  # seconds between journal compactions
+}
@@ -1 +1 @@
-from .en import music_py
+# language packs (<code>.py with a music_py dict), imported on first use by bot.utils.Locales
@@ -1,25 +1,56 @@
 music_py = {
     # default info
-    "added_tracks": "Added to the queue: ",  # Added tracks
+    "added_tracks": "Added to the queue: `{title}`.",  # Added tracks
+    "playlist_loading": "Loading playlist `{name}`: {added}/{total} tracks",  # playlist progress
+    "playlist_added": "Added playlist `{name}`: {added}/{total} tracks",  # playlist fully queued
+    "playlist_cancelled": "Stopped loading playlist `{name}`: {added}/{total} tracks",  # stop or disconnect while loading
     "choose_track": "Choose a track",  # track choice title
     "query_results": "Results",  # results
-    "invoke": "Invoked by",  # command invoke
-    "connected_to": "Connected to",  # bot connected to channel
+    "invoke": "Invoked by {author}",  # command invoke
+    "connected_to": "Connected to {channel}.",  # bot connected to channel
     "disconnected_from": "Disconnected from a channel.",  # bot disconnected from channel
     "resumed": "Resumed playback.",  # resume playback
     "stopped": "Stopped playing playback.",  # stop playback
     "skipped": "Plaing next song from queue.",  # skip to the next song
     "shuffled": "Shuffled tracks in queue.",  # shuffle queue
-    "repeat_mode": "Current repeat mode is now:",  # setting repeat mode
+    "repeat_mode": "Current repeat mode is now: {mode}.",  # setting repeat mode
+    "repeat_all_partial": "Current repeat mode is now: all. Looping the last {count} tracks, {released} older ones were already let go.",  # repeat all after history was trimmed
     "previous": "Playing previous track from queue.",  # playing previous track
     "paused": "Paused playback.",  # pause playback
+    "language": "Language: {code} (available: {available})",  # current guild language
+    "language_set": "Language set to {code}.",  # guild language changed
     
     # queue command embed
     "q_title": "Queue",  # title
-    "q_description": "Showing up to 10 queries",  # description (change number)
+    "q_description": "Page {page}/{pages} | {tracks} tracks | {duration} total",  # page and queue summary
+    "q_live": "live",  # length of streams
     "q_current": "Currently playing",  # current track
     "q_next": "Next song",  # next track
     
+    # history and stats command embeds
+    "history_title": "Recently played",  # title
+    "no_history": "Nothing has been played here yet.",  # no plays recorded
+    "stats_title": "Most played",  # title
+    "stats_description": "{plays} plays | {tracks} tracks | {duration} played",  # guild totals
+    "stats_plays": "{plays} plays",  # plays of one track
+    
+    # gaps command embed
+    "gaps_title": "Gap between tracks",  # title
+    "no_gaps": "No track changes measured yet.",  # no samples
+    
+    # picker command embed
+    "picker_title": "Track picker latency",  # title
+    "picker_ready": "Accepting picks",  # message sent, listening for picks
+    "picker_buttons": "All reactions added",  # reactions done
+    "no_picker": "No track pickers measured yet.",  # no samples
+    
+    # outbox command embed
+    "outbox_title": "Outgoing messages",  # title
+    
+    # profile command embed
+    "profile_title": "Event loop profile",  # title
+    "profile_busy": "A profile is already running.",  # profiles can't overlap
+    
     # error messages
     "dm_error": "Sorry, music commands are not available in DMs.",  # DM message command error
     "already_connected_error": "Already connected to a voice channel.",  # AlreadyConnectedToChannel
@@ -28,4 +59,8 @@ music_py = {
     "already_paused_error": "Playback is already paused.",  # Already Paused
     "no_more_tracks_error": "There are no more tracks in queue.",  # No more tracks
     "no_previous_tracks_error": "There are no previous tracks in queue.",  # No previous tracks
+    "unknown_language_error": "There is no {code} language pack.",  # language command with unknown code
+    "missing_permissions_error": "You need the Manage Server permission to do that.",  # language change by a non manager
+    "throttled_error": "Slow down, try again in {seconds}s.",  # user or guild command budget used up
+    "too_many_searches_error": "Still searching, wait for the current searches to finish.",  # per guild search cap
 }
@@ -0,0 +1,61 @@
+# imports
+import asyncio
+import json
+
+import aiohttp
+import discord
+
+
+# global vars
+loop = "asyncio"  # event loop in use, set by install()
+codec = "json"  # json library decoding gateway, REST and lavalink payloads
+dumps = None  # fast serializer for the wavelink client, None keeps wavelink's own
+
+
+class _JsonModule:  # stands in for the json module inside discord.py, only loads is replaced
+    def __init__(self, loads):
+        self.loads = loads
+
+    def __getattr__(self, name):
+        return getattr(json, name)
+
+
+def _install_uvloop():
+    try:
+        import uvloop
+    except ImportError:
+        print("uvloop is not installed, using the asyncio event loop.")
+        return "asyncio"
+
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())  # discord.py creates its loop from the policy
+    return "uvloop"
+
+
+def _install_orjson():
+    global dumps
+    try:
+        import orjson
+    except ImportError:
+        print("orjson is not installed, using the json module.")
+        return "json"
+
+    def to_json(obj):  # discord.py and lavalink want text frames
+        return orjson.dumps(obj).decode("utf-8")
+
+    discord.gateway.json = discord.http.json = _JsonModule(orjson.loads)  # gateway events and REST responses
+    discord.utils.to_json = to_json  # gateway commands and REST bodies
+    aiohttp.WSMessage.json.__kwdefaults__["loads"] = orjson.loads  # lavalink websocket events
+    aiohttp.ClientResponse.json.__kwdefaults__["loads"] = orjson.loads  # lavalink /loadtracks
+    dumps = to_json  # lavalink websocket commands, set on the client with set_serializer
+    return "orjson"
+
+
+def install(profile="default"):  # "fast": uvloop and orjson when installed, before the bot creates its loop
+    global loop, codec
+    if profile == "fast" and loop == "asyncio":
+        loop = _install_uvloop()
+        codec = _install_orjson()
+    elif profile not in ("default", "fast"):
+        print(f"Unknown runtime profile {profile!r}, using the default one.")
+
+    print(f"Runtime: {loop} event loop, {codec} codec")
@@ -0,0 +1,14 @@
+from .admission import Admission, TokenBuckets
+from .cache import SearchCache
+from .history import PlayHistory
+from .journal import PlayerState, QueueJournal
+from .locales import Locales, used_keys
+from .metrics import Metrics
+from .nodes import NodePool
+from .outbox import Outbox
+from .pages import QueuePages, format_duration
+from .profiler import Profiler
+from .reaper import IdleReaper
+from .resolver import TrackResolver
+from .router import QueryKind, Route, route as route_query
+from .tracks import SharedTrack, TrackRegistry
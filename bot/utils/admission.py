@@ -0,0 +1,84 @@
+# imports
+import time
+from collections import Counter, OrderedDict
+
+
+# token bucket per key, a bucket untouched long enough to be full again is forgotten
+class TokenBuckets:
+    def __init__(self, rate, per):
+        self.rate = rate  # tokens in a full bucket, the burst allowed
+        self.per = per  # seconds to refill an empty bucket
+        self._buckets = OrderedDict()  # key -> (tokens, updated), least recently used first
+
+    def __len__(self):
+        return len(self._buckets)
+
+    def _tokens(self, key, now):
+        if (bucket := self._buckets.get(key)) is None:
+            return self.rate
+
+        tokens, updated = bucket
+        return min(self.rate, tokens + (now - updated) * self.rate / self.per)
+
+    def retry_after(self, key, now, cost=1):  # 0 when the bucket has cost tokens
+        tokens = self._tokens(key, now)
+        return 0.0 if tokens >= cost else (cost - tokens) * self.per / self.rate
+
+    def take(self, key, now, cost=1):
+        self._buckets[key] = (self._tokens(key, now) - cost, now)
+        self._buckets.move_to_end(key)
+
+        while self._buckets:  # oldest first, amortized O(1) and only keys used in the last `per` seconds stay
+            _, (_, updated) = next(iter(self._buckets.items()))
+            if now - updated < self.per:
+                break
+            self._buckets.popitem(last=False)
+
+
+# decides which commands run: user and guild budgets, and a cap on searches running at once per guild
+class Admission:
+    def __init__(self, user=(5, 10), guild=(20, 10), searches=2, costs=None):
+        self.users = TokenBuckets(*user)
+        self.guilds = TokenBuckets(*guild)
+        self.max_searches = searches
+        self.costs = costs or {}  # command name -> tokens, other commands cost 1 and 0 is free
+        self._searches = {}  # guild id -> searches running, only guilds searching right now
+        self.counters = Counter()  # "user", "guild", "searches" refused, "merged" skip presses
+
+    @property
+    def stats(self):
+        return {
+            "user": self.counters["user"],
+            "guild": self.counters["guild"],
+            "searches": self.counters["searches"],
+            "merged": self.counters["merged"],
+            "buckets": len(self.users) + len(self.guilds),
+        }
+
+    def admit(self, guild_id, user_id, command):  # 0 when the command may run, else seconds until it may
+        if not (cost := self.costs.get(command, 1)):
+            return 0.0
+
+        now = time.monotonic()
+        if wait := self.users.retry_after(user_id, now, cost):
+            self.counters["user"] += 1
+            return wait
+        if wait := self.guilds.retry_after(guild_id, now, cost):
+            self.counters["guild"] += 1
+            return wait
+
+        self.users.take(user_id, now, cost)  # both budgets are charged only when both allow it
+        self.guilds.take(guild_id, now, cost)
+        return 0.0
+
+    def start_search(self, guild_id):  # False when the guild already has max_searches running
+        if (running := self._searches.get(guild_id, 0)) >= self.max_searches:
+            self.counters["searches"] += 1
+            return False
+
+        self._searches[guild_id] = running + 1
+        return True
+
+    def end_search(self, guild_id):
+        if (running := self._searches.pop(guild_id, 0) - 1) > 0:
+            self._searches[guild_id] = running
@@ -0,0 +1,145 @@
+# imports
+import json
+import os
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+import wavelink
+
+
+# search results cache (LRU + TTL) used in front of wavelink.get_tracks
+class SearchCache:
+    def __init__(self, max_size=2048, ttl=21600, path=None, max_tracks=16384, registry=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.path = Path(path) if path else None
+        self.max_tracks = max_tracks
+        self.registry = registry  # TrackRegistry, tracks loaded from the file are shared with queues
+        self._entries = OrderedDict()  # key -> (expires_at, result), oldest first
+        self._tracks = OrderedDict()  # lavalink identifier -> track seen in any result, oldest first
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def normalize(query):
+        query = " ".join(query.split())  # collapse whitespace
+
+        if query.startswith(("ytsearch:", "ytmsearch:", "scsearch:")):  # search terms are case insensitive, urls are not
+            return query.casefold()
+
+        return query
+
+    @property
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+    def get(self, query):
+        key = self.normalize(query)
+
+        try:
+            expires_at, result = self._entries[key]
+        except KeyError:
+            self.misses += 1
+            return None
+
+        if expires_at <= time.time():  # expired entry
+            del self._entries[key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return result
+
+    def put(self, query, result):
+        if not result:  # don't cache empty searches
+            return
+
+        key = self.normalize(query)
+        self._entries[key] = (time.time() + self.ttl, result)
+        self._entries.move_to_end(key)
+        self._index(result)
+
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def _index(self, result):
+        for track in result.tracks if isinstance(result, wavelink.TrackPlaylist) else result:
+            if track.identifier:
+                self._tracks[track.identifier] = track
+                self._tracks.move_to_end(track.identifier)
+
+        while len(self._tracks) > self.max_tracks:
+            self._tracks.popitem(last=False)
+
+    def get_track(self, identifier):  # track by lavalink identifier (youtube video id), no search needed
+        if (track := self._tracks.get(identifier)) is None:
+            return None
+
+        self._tracks.move_to_end(identifier)
+        self.hits += 1
+        return track
+
+    def clear(self):
+        self._entries.clear()
+        self._tracks.clear()
+
+    def evict_expired(self):
+        now = time.time()
+        for key in [k for k, (expires_at, _) in self._entries.items() if expires_at <= now]:
+            del self._entries[key]
+
+    # persistence
+    @staticmethod
+    def _dump_result(result):
+        if isinstance(result, wavelink.TrackPlaylist):
+            return {"playlist": result.data}
+
+        return {"tracks": [[t.id, t.info] for t in result]}
+
+    def _load_result(self, data):
+        if "playlist" in data:
+            result = wavelink.TrackPlaylist(data=data["playlist"])
+        else:
+            result = [wavelink.Track(id_=id_, info=info) for id_, info in data["tracks"]]
+
+        return self.registry.intern_result(result, stored=True) if self.registry is not None else result
+
+    def load(self):
+        if self.path is None or not self.path.exists():
+            return
+
+        try:
+            with open(self.path, "r", encoding="UTF-8") as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            print(f"Search cache file {self.path} is unreadable, starting empty.")
+            return
+
+        now = time.time()
+        for key, expires_at, data in entries[-self.max_size:]:  # stored oldest first
+            if expires_at > now:
+                self._entries[key] = (expires_at, result := self._load_result(data))
+                self._index(result)
+
+    def save(self):
+        if self.path is None:
+            return
+
+        self.evict_expired()
+        entries = [[key, expires_at, self._dump_result(result)] for key, (expires_at, result) in self._entries.items()]
+
+        tmp = self.path.with_suffix(".tmp")  # write then rename so crash never leaves half a file
+        with open(tmp, "w", encoding="UTF-8") as f:
+            json.dump(entries, f)
+        os.replace(tmp, self.path)
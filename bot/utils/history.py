@@ -0,0 +1,178 @@
+# imports
+import asyncio
+import json
+import struct
+import time
+from array import array
+from pathlib import Path
+
+import wavelink
+
+
+# global vars
+RECORD = struct.Struct("<QII")  # guild id, unix seconds, track number: 16 bytes a play
+
+
+# one guild's plays: the latest ones in two parallel arrays and play counts with a top list kept up to date
+class GuildHistory:
+    __slots__ = ("tracks", "times", "counts", "top", "plays", "played_ms")
+
+    def __init__(self):
+        self.tracks = array("I")  # track numbers, oldest first
+        self.times = array("I")  # unix seconds of each play
+        self.counts = {}  # track number -> plays
+        self.top = []  # most played track numbers, highest first
+        self.plays = 0
+        self.played_ms = 0
+
+
+# append-only play log: plays are fixed size binary records, tracks are numbered once in a json lines table
+class PlayHistory:
+    def __init__(self, path, recent=100, top=10, flush_interval=5, registry=None):
+        self.path = Path(path) if path else None  # None keeps the history in memory only
+        self.recent = recent  # plays kept per guild for the history command
+        self.top_size = top
+        self.flush_interval = flush_interval  # seconds between writes, plays are buffered meanwhile
+        self.registry = registry  # TrackRegistry, replayed tracks are shared with queues
+        self._guilds = {}  # guild id -> GuildHistory
+        self.total = GuildHistory()  # every guild together
+        self._numbers = {}  # identifier -> track number
+        self._tracks = []  # track number -> [id, info]
+        self._records = bytearray()  # plays not written yet
+        self._new_tracks = []  # track table lines not written yet
+        self._task = None
+
+    @property
+    def tracks_path(self):
+        return self.path.with_suffix(".tracks")
+
+    def __len__(self):
+        return self.total.plays
+
+    # recording
+    def record(self, guild_id, track, at=None):  # called from the event loop, nothing touches the disk here
+        number = self._number(track.identifier or track.id, track.id, track.info)
+        at = int(at or time.time())
+        self._add(guild_id, number, at)
+        if self.path is not None:
+            self._records += RECORD.pack(guild_id, at, number)
+
+    def _number(self, key, id_, info):
+        if (number := self._numbers.get(key)) is None:
+            number = self._numbers[key] = len(self._tracks)
+            self._tracks.append([id_, info])
+            if self.path is not None:
+                self._new_tracks.append([number, id_, info])
+        return number
+
+    def _add(self, guild_id, number, at):
+        if (guild := self._guilds.get(guild_id)) is None:
+            guild = self._guilds[guild_id] = GuildHistory()
+
+        info = self._tracks[number][1]
+        length = 0 if info.get("isStream") else info.get("length") or 0
+        for history in (guild, self.total):
+            history.tracks.append(number)
+            history.times.append(at)
+            if len(history.tracks) >= 2 * self.recent:  # trimmed in batches, amortized O(1)
+                del history.tracks[:-self.recent]
+                del history.times[:-self.recent]
+            history.plays += 1
+            history.played_ms += length
+            self._rank(history, number)
+
+    def _rank(self, history, number):  # counts only grow by one, so moving the track up keeps the top list exact
+        count = history.counts[number] = history.counts.get(number, 0) + 1
+        top = history.top
+        if number not in top:
+            if len(top) < self.top_size:
+                top.append(number)
+            elif count > history.counts[top[-1]]:
+                top[-1] = number
+            else:
+                return
+
+        i = top.index(number)
+        while i and history.counts[top[i - 1]] < count:
+            top[i - 1], top[i] = top[i], top[i - 1]
+            i -= 1
+
+    # queries, none of them scans the log
+    def track(self, number):
+        id_, info = self._tracks[number]
+        track = wavelink.Track(id_=id_, info=info)
+        return self.registry.intern(track, stored=True) if self.registry is not None else track
+
+    def guild(self, guild_id=None):  # None is every guild together
+        return self.total if guild_id is None else self._guilds.get(guild_id) or GuildHistory()
+
+    def most_played(self, guild_id=None, count=10):  # [(track, plays)], most played first
+        history = self.guild(guild_id)
+        return [(self.track(n), history.counts[n]) for n in history.top[:count]]
+
+    def recently_played(self, guild_id=None, count=10):  # [(track, unix seconds)], newest first
+        history = self.guild(guild_id)
+        return [(self.track(n), at) for n, at in zip(history.tracks[::-1][:count], history.times[::-1][:count])]
+
+    def summary(self, guild_id=None):
+        history = self.guild(guild_id)
+        return {"plays": history.plays, "tracks": len(history.counts), "played_ms": history.played_ms}
+
+    # persistence
+    def load(self):  # rebuilds the aggregates, runs once at startup
+        if self.path is None or not self.path.exists():
+            return
+
+        if self.tracks_path.exists():
+            with open(self.tracks_path, "r", encoding="UTF-8") as f:
+                for line in f:
+                    try:
+                        number, id_, info = json.loads(line)
+                    except ValueError:  # torn last line after a crash
+                        continue
+                    self._tracks.extend([None] * (number + 1 - len(self._tracks)))
+                    self._tracks[number] = [id_, info]
+                    self._numbers[info.get("identifier") or id_] = number
+
+        with open(self.path, "rb") as f:
+            data = f.read()
+        data = memoryview(data)[:len(data) - len(data) % RECORD.size]  # torn last record
+        for guild_id, at, number in RECORD.iter_unpack(data):
+            if number < len(self._tracks) and self._tracks[number] is not None:
+                self._add(guild_id, number, at)
+
+    def _write(self, records, tracks):  # track lines go first, a record never points at a missing track
+        if tracks:
+            with open(self.tracks_path, "a", encoding="UTF-8") as f:
+                f.writelines(json.dumps(t, separators=(",", ":")) + "\n" for t in tracks)
+        if records:
+            with open(self.path, "ab") as f:
+                f.write(records)
+
+    def _take(self):
+        records, self._records = self._records, bytearray()
+        tracks, self._new_tracks = self._new_tracks, []
+        return records, tracks
+
+    async def flush(self, loop):  # writes in a thread, the event loop keeps recording
+        if self._records or self._new_tracks:
+            await loop.run_in_executor(None, self._write, *self._take())
+
+    def start(self, loop):
+        if self.path is not None and self._task is None:
+            self._task = loop.create_task(self.run(loop))
+
+    async def run(self, loop):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush(loop)
+            except OSError as exc:
+                print(f"Could not write play history: {exc}")
+
+    def close(self):  # last plays are written right away
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self.path is not None:
+            self._write(*self._take())
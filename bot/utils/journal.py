@@ -0,0 +1,148 @@
+# imports
+import json
+import os
+from pathlib import Path
+
+import wavelink
+
+
+# what a player needs to pick up where it left off
+class PlayerState:
+    __slots__ = ("queue", "channel_id", "track_position", "paused")
+
+    def __init__(self, queue, channel_id=None, track_position=0, paused=False):
+        self.queue = queue
+        self.channel_id = channel_id
+        self.track_position = track_position  # ms into the current track
+        self.paused = paused
+
+
+def _encode(obj):  # json default for tracks
+    if isinstance(obj, wavelink.Track):
+        return [obj.id, obj.info]
+
+    raise TypeError(f"{type(obj).__name__} is not journal serializable")
+
+
+# append-only journal of queue mutations, one json line per change:
+#   [guild_id, op, *args]   op is a Queue method name, "channel", "close" or "snapshot"
+# compaction rewrites it as one snapshot per player
+class QueueJournal:
+    TRACK_OPS = {"add": slice(0, None), "insert": slice(1, None), "replace_current": slice(0, None)}  # args holding tracks
+
+    def __init__(self, path, compact_interval=300, registry=None):
+        self.path = Path(path)
+        self.compact_interval = compact_interval
+        self.registry = registry  # TrackRegistry, restored queues share tracks instead of decoding copies
+        self.records = 0  # records written since the last compaction
+        self._file = None
+        self._pending = None  # records arriving while a compaction is being written
+
+    # writing
+    def record(self, guild_id, op, *args):
+        line = json.dumps([guild_id, op, *args], default=_encode, separators=(",", ":")) + "\n"
+
+        if self._pending is not None:
+            self._pending.append(line)
+        elif self._file is not None:
+            self._file.write(line)
+            self._file.flush()  # survives a process crash without paying for fsync
+            self.records += 1
+
+    def open(self):
+        self._file = open(self.path, "a", encoding="UTF-8")
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    @staticmethod
+    def snapshot(guild_id, state):
+        return [guild_id, "snapshot", {
+            "queue": state.queue.snapshot(),
+            "channel_id": state.channel_id,
+            "track_position": state.track_position,
+            "paused": state.paused,
+        }]
+
+    def _write_snapshots(self, snapshots):
+        tmp = self.path.with_suffix(".tmp")  # write then rename, a crash mid-write keeps the old journal
+        with open(tmp, "w", encoding="UTF-8") as f:
+            for snapshot in snapshots:
+                f.write(json.dumps(snapshot, default=_encode, separators=(",", ":")) + "\n")
+        os.replace(tmp, self.path)
+
+    def _reopen(self, pending):
+        self.close()
+        self.open()
+        self._file.writelines(pending)
+        self._file.flush()
+        self.records = len(pending)
+
+    def compact_now(self, states):  # states: guild_id -> PlayerState
+        self._write_snapshots([self.snapshot(g, s) for g, s in states.items()])
+        self._reopen([])
+
+    async def compact(self, states, loop):  # serializes in a thread, the event loop keeps running
+        if self._pending is not None:  # already compacting
+            return
+
+        snapshots = [self.snapshot(g, s) for g, s in states.items()]  # taken now, so it's consistent
+        self._pending = []
+        try:
+            await loop.run_in_executor(None, self._write_snapshots, snapshots)
+        finally:
+            pending, self._pending = self._pending, None
+            self._reopen(pending)
+
+    # replaying
+    def load(self, queue_cls):  # rebuilds PlayerState for every guild in the journal
+        states = {}
+        if not self.path.exists():
+            return states
+
+        with open(self.path, "r", encoding="UTF-8") as f:
+            for line in f:
+                try:
+                    guild_id, op, *args = json.loads(line)
+                except ValueError:  # torn last line after a crash
+                    continue
+
+                try:
+                    self._apply(states, queue_cls, guild_id, op, args)
+                except Exception as exc:
+                    print(f"Skipping journal record {op} for {guild_id}: {exc}")
+
+        return states
+
+    def _decode(self, data):
+        track = wavelink.Track(id_=data[0], info=data[1])
+        return self.registry.intern(track, stored=True) if self.registry is not None else track
+
+    def _apply(self, states, queue_cls, guild_id, op, args):
+        if op == "close":
+            states.pop(guild_id, None)
+            return
+
+        if op == "snapshot":
+            data = args[0]
+            queue = queue_cls().load_snapshot({**data["queue"], "tracks": [self._decode(t) for t in data["queue"]["tracks"]]})
+            states[guild_id] = PlayerState(queue, data["channel_id"], data["track_position"], data["paused"])
+            return
+
+        if (state := states.get(guild_id)) is None:
+            state = states[guild_id] = PlayerState(queue_cls())
+
+        if op == "channel":
+            state.channel_id = args[0]
+            return
+
+        if op in self.TRACK_OPS:
+            tracks = self.TRACK_OPS[op]
+            args[tracks] = [self._decode(t) for t in args[tracks]]
+
+        if op in ("get_next_track", "rewind", "empty"):  # current track changed
+            state.track_position = 0
+
+        getattr(state.queue, op)(*args)
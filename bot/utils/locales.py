@@ -0,0 +1,162 @@
+# imports
+import ast
+import importlib
+import inspect
+import json
+import os
+import pkgutil
+from pathlib import Path
+from string import Formatter
+
+import discord
+
+
+# global vars
+KEY_ARGS = {"text": 0, "embed": 0, "notify": 1}  # method name -> position of the message key in its arguments
+
+
+def _fields(text):  # placeholder names used by a message, e.g. {"title"} for "Added `{title}`."
+    return {name for _, name, _, _ in Formatter().parse(text) if name}
+
+
+def used_keys(*modules):  # key -> placeholders every call passes, for calls with a literal key in the modules' source
+    used = {}
+    for module in modules:
+        for node in ast.walk(ast.parse(inspect.getsource(module))):
+            if not isinstance(node, ast.Call) or not isinstance(node.func, ast.Attribute):
+                continue
+            if (i := KEY_ARGS.get(node.func.attr)) is None or len(node.args) <= i:
+                continue
+            if not isinstance(key := node.args[i], ast.Constant) or not isinstance(key.value, str):
+                continue
+            if any(keyword.arg is None for keyword in node.keywords):  # **values, can't tell what is passed
+                continue
+
+            passed = {keyword.arg for keyword in node.keywords}
+            used[key.value] = used[key.value] & passed if key.value in used else passed
+
+    return used
+
+
+# one message of a language pack, parsed once
+class Template:
+    __slots__ = ("text", "fields", "colour")
+
+    def __init__(self, text, colour):
+        self.text = text
+        self.fields = _fields(text)
+        self.colour = colour
+
+    def format(self, **values):
+        return self.text.format(**values) if self.fields else self.text  # static messages skip formatting
+
+    def embed(self, **values):
+        return discord.Embed(title=self.format(**values), colour=self.colour)
+
+
+# a loaded language pack, missing keys fall back to the default pack
+class Locale:
+    def __init__(self, code, texts, colours, fallback=None):
+        self.code = code
+        self.texts = texts
+        self.colours = colours  # (info, error), error is used for keys ending with _error
+        self.fallback = fallback
+        self._templates = {}  # key -> Template, filled on first use
+
+    def __getitem__(self, key):
+        try:
+            return self._templates[key]
+        except KeyError:
+            if key in self.texts:
+                text = self.texts[key]
+            elif self.fallback is not None:
+                text = self.fallback[key].text
+            else:
+                raise KeyError(f"No message {key!r} in language pack {self.code!r}") from None
+
+            template = self._templates[key] = Template(text, self.colours[key.endswith("_error")])
+            return template
+
+    def text(self, key, **values):
+        return self[key].format(**values)
+
+    def embed(self, key, **values):
+        return self[key].embed(**values)
+
+
+# language packs (bot/data/langs/<code>.py defining music_py), imported on first use
+class Locales:
+    def __init__(self, package, default="en", guilds=None, colours=(0x5bc0de, 0xdc3545), path=None):
+        self.package = package
+        self.default = default
+        self.guilds = dict(guilds or {})  # guild id -> locale code
+        self.colours = colours
+        self.path = Path(path) if path else None  # languages set with the command, None keeps them in memory only
+        self._chosen = {}  # guild id -> locale code set with the command, what gets saved
+        self._locales = {}  # code -> Locale
+
+    @property
+    def available(self):
+        return sorted(m.name for m in pkgutil.iter_modules(importlib.import_module(self.package).__path__))
+
+    def get(self, code):
+        try:
+            return self._locales[code]
+        except KeyError:
+            texts = importlib.import_module(f"{self.package}.{code}").music_py
+            fallback = None if code == self.default else self.get(self.default)
+            locale = self._locales[code] = Locale(code, texts, self.colours, fallback)
+            return locale
+
+    def for_guild(self, guild_id):
+        return self.get(self.guilds.get(guild_id, self.default))
+
+    def set_guild(self, guild_id, code):
+        if code not in self.available:
+            raise KeyError(code)
+
+        self.guilds[guild_id] = self._chosen[guild_id] = code
+
+    def load(self):  # languages chosen with the command win over the configured ones
+        if self.path is None or not self.path.exists():
+            return
+
+        with open(self.path, "r", encoding="UTF-8") as f:
+            chosen = {int(guild_id): code for guild_id, code in json.load(f).items()}
+
+        self._chosen.update(chosen)
+        self.guilds.update(chosen)
+
+    def save(self):  # a few bytes per guild that chose a language, written on every change
+        if self.path is None:
+            return
+
+        tmp = self.path.with_suffix(".tmp")  # write then rename so crash never leaves half a file
+        with open(tmp, "w", encoding="UTF-8") as f:
+            json.dump(self._chosen, f)
+        os.replace(tmp, self.path)
+
+    def validate(self, used=None):  # code -> problems, every pack must have the default keys with the same placeholders
+        default = self.get(self.default).texts
+        problems = {}
+        if used:  # from used_keys(), the default pack must have every key the code asks for
+            found = [f"missing {key} used by the code" for key in used if key not in default]
+            found += [
+                f"{key} uses {sorted(missing)} the code doesn't pass"
+                for key, passed in used.items() if key in default and (missing := _fields(default[key]) - passed)
+            ]
+            if found:
+                problems[self.default] = found
+
+        for code in self.available:
+            texts = self.get(code).texts
+            found = [f"missing {key}" for key in default if key not in texts]
+            found += [f"unknown {key}" for key in texts if key not in default]
+            found += [
+                f"{key} uses {sorted(_fields(texts[key]))} instead of {sorted(_fields(text))}"
+                for key, text in default.items() if key in texts and _fields(texts[key]) != _fields(text)
+            ]
+            if found:
+                problems.setdefault(code, []).extend(found)
+
+        return problems
@@ -0,0 +1,152 @@
+# imports
+import asyncio
+import time
+from bisect import bisect_left
+
+
+# global vars
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+LAG_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+
+def _labels(names, values):
+    if not names:
+        return ""
+
+    return "{" + ",".join(f'{n}="{str(v)}"' for n, v in zip(names, values)) + "}"
+
+
+# monotonically increasing count, one value per label set
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.values = {}  # label values tuple -> count
+
+    def inc(self, labels=(), amount=1):
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def samples(self):
+        for values, count in self.values.items():
+            yield f"{self.name}{_labels(self.labels, values)} {count}"
+
+
+# value read at scrape time, nothing is recorded on the hot path
+class Gauge:
+    kind = "gauge"
+
+    def __init__(self, name, help, read, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.read = read  # () -> value, or {label values tuple: value} when there are labels
+
+    def samples(self):
+        if not self.labels:
+            yield f"{self.name} {self.read()}"
+            return
+
+        for values, value in self.read().items():
+            yield f"{self.name}{_labels(self.labels, values)} {value}"
+
+
+# fixed buckets, observe is a bisect and two additions
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        self.values = {}  # label values tuple -> [per bucket counts (+Inf last), sum]
+
+    def observe(self, value, labels=()):
+        try:
+            data = self.values[labels]
+        except KeyError:
+            data = self.values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+
+        data[0][bisect_left(self.buckets, value)] += 1
+        data[1] += value
+
+    def samples(self):
+        for values, (counts, total) in self.values.items():
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), counts):
+                cumulative += count
+                yield f"{self.name}_bucket{_labels((*self.labels, 'le'), (*values, bound))} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.labels, values)} {total}"
+            yield f"{self.name}_count{_labels(self.labels, values)} {cumulative}"
+
+
+# process metrics served in the prometheus text format on /metrics
+class Metrics:
+    def __init__(self):
+        self._metrics = {}  # name -> metric, in registration order
+        self._runner = None
+        self._lag_task = None
+        self.loop_lag = self.histogram("senpy_loop_lag_seconds", "Event loop scheduling delay.", buckets=LAG_BUCKETS)
+
+    def _add(self, metric):
+        self._metrics[metric.name] = metric  # registering again (cog reload) replaces the old one
+        return metric
+
+    def counter(self, name, help, labels=()):
+        return self._add(Counter(name, help, labels))
+
+    def gauge(self, name, help, read, labels=()):
+        return self._add(Gauge(name, help, read, labels))
+
+    def histogram(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        return self._add(Histogram(name, help, labels, buckets))
+
+    def unregister(self, *names):
+        for name in names:
+            self._metrics.pop(name, None)
+
+    def render(self):
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            try:
+                lines.extend(metric.samples())
+            except Exception as exc:  # a broken gauge shouldn't hide the others
+                lines.append(f"# {metric.name} failed: {exc}")
+
+        return "\n".join(lines) + "\n"
+
+    async def _handle(self, request):
+        from aiohttp import web
+
+        return web.Response(text=self.render(), content_type="text/plain", charset="utf-8")
+
+    async def start(self, host, port, lag_interval=0.5):
+        from aiohttp import web  # imported here, the server is optional and aiohttp.web is slow to import
+
+        app = web.Application()
+        app.router.add_get("/metrics", self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+        self._lag_task = asyncio.get_event_loop().create_task(self.watch_loop(lag_interval))
+        print(f"Metrics available on http://{host}:{port}/metrics")
+
+    async def close(self):
+        if self._lag_task is not None:
+            self._lag_task.cancel()
+            self._lag_task = None
+
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def watch_loop(self, interval):  # how late a sleep wakes up is how busy the loop is
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(interval)
+            self.loop_lag.observe(max(0.0, time.perf_counter() - started - interval))
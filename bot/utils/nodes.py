@@ -0,0 +1,128 @@
+# imports
+import asyncio
+import time
+
+import wavelink
+from wavelink.backoff import ExponentialBackoff
+
+
+# lavalink node pool with load aware placement and player failover
+class NodePool:
+    def __init__(self, client, nodes, health_interval=5, failover_after=10):
+        self.client = client  # wavelink.Client
+        self.config = nodes  # identifier -> wavelink.Client.initiate_node kwargs
+        self.health_interval = health_interval
+        self.failover_after = failover_after  # seconds a node has to be down before moving its players
+        self._down_since = {}
+        self._retry_at = {}  # identifier -> (monotonic time of next reconnect, backoff)
+        self._monitor = None
+        self.migrated = 0  # players moved off failed nodes
+        self.reconnects = 0  # listener restarts after a node connection died
+
+    @property
+    def nodes(self):
+        return self.client.nodes
+
+    async def connect(self):  # all nodes at once, startup waits for the slowest one instead of the sum
+        nodes = list(self.config.values())
+        results = await asyncio.gather(*(self.client.initiate_node(**node) for node in nodes), return_exceptions=True)
+
+        for node, result in zip(nodes, results):
+            if isinstance(result, Exception):  # one bad node shouldn't keep the others down
+                print(f"Could not initiate node {node['identifier']}: {result}")
+
+        if self._monitor is None:
+            self._monitor = self.client.loop.create_task(self.monitor())
+
+    def close(self):
+        if self._monitor is not None:
+            self._monitor.cancel()
+            self._monitor = None
+
+    @staticmethod
+    def load_score(node):  # lower is better
+        if not node.is_available:
+            return float("inf")
+
+        players = len(node.players)  # players we placed since the last stats update
+        if (stats := node.stats) is None:
+            return players
+
+        penalty = stats.penalty  # cpu load and frame deficit/nulled penalties from node stats
+        return (
+            max(players, stats.playing_players)
+            + penalty.cpu_penalty
+            + penalty.null_frame_penalty
+            + penalty.deficit_frame_penalty
+        )
+
+    def best(self, exclude=None):
+        nodes = [n for n in self.nodes.values() if n is not exclude and n.is_available]
+        if not nodes:
+            return None
+
+        return min(nodes, key=self.load_score)
+
+    def find_player(self, guild_id):  # existing player or None, never creates one
+        for node in self.nodes.values():  # cheaper than wavelink.Client.players which rebuilds a dict
+            if (player := node.players.get(guild_id)) is not None:
+                return player
+
+        return None
+
+    def get_player(self, guild_id, **kwargs):
+        if (player := self.find_player(guild_id)) is not None:
+            return player
+
+        node = self.best()
+        return self.client.get_player(guild_id, node_id=node.identifier if node else None, **kwargs)
+
+    async def failover(self, node):  # move players to healthy nodes, keeps track, position and queue
+        moved = 0
+        for player in list(node.players.values()):
+            if (target := self.best(exclude=node)) is None:
+                print(f"No healthy node to move players from {node.identifier} to.")
+                break
+
+            paused = player.is_paused  # the play change_node resends must not leave it playing
+            try:
+                await player.change_node(target.identifier)
+                if paused:
+                    await player.set_pause(True)
+            except wavelink.WavelinkException as exc:
+                print(f"Could not move player {player.guild_id} to {target.identifier}: {exc}")
+            else:
+                moved += 1
+
+        self.migrated += moved
+        if moved:
+            print(f"Moved {moved} players from {node.identifier}.")
+
+    async def check(self):
+        now = time.monotonic()
+        for identifier, node in list(self.nodes.items()):
+            if node.is_available:
+                self._down_since.pop(identifier, None)
+                self._retry_at.pop(identifier, None)
+                continue
+
+            down_since = self._down_since.setdefault(identifier, now)
+            websocket = node._websocket
+            if websocket._task is None or websocket._task.done():  # listener never started or died, wavelink won't retry
+                retry_at, backoff = self._retry_at.setdefault(identifier, (now, ExponentialBackoff(self.health_interval)))
+                if now >= retry_at:
+                    self._retry_at[identifier] = (now + backoff.delay(), backoff)
+                    websocket._task = None
+                    self.reconnects += 1
+                    await websocket._connect()
+
+            if node.players and now - down_since >= self.failover_after:
+                await self.failover(node)
+
+    async def monitor(self):
+        while True:
+            await asyncio.sleep(self.health_interval)
+            try:
+                await self.check()
+            except Exception as exc:
+                print(f"Node health check failed: {exc}")
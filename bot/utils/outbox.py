@@ -0,0 +1,162 @@
+# imports
+import asyncio
+import time
+from collections import deque
+
+import discord
+
+
+# status notice waiting to be sent
+class Notice:
+    __slots__ = ("text", "colour", "queued")
+
+    def __init__(self, text, colour):
+        self.text = text
+        self.colour = colour
+        self.queued = time.monotonic()
+
+
+# per channel state: pending notices, send budget and the last message for editing
+class ChannelBox:
+    __slots__ = ("channel", "pending", "task", "tokens", "updated", "message", "lines", "colour", "sent_at")
+
+    def __init__(self, channel, rate):
+        self.channel = channel
+        self.pending = deque()
+        self.task = None
+        self.tokens = rate  # send budget, refilled over time
+        self.updated = time.monotonic()
+        self.message = None  # last message sent by the outbox, edited while it's recent
+        self.lines = []  # [text, count] shown in that message
+        self.colour = None
+        self.sent_at = 0.0
+
+
+# outbound status embeds, sent right away when the channel has budget, coalesced while a send is in flight or it has none
+class Outbox:
+    def __init__(self, edit_window=10, max_age=15, max_lines=10, rate=5, per=5, samples=1000):
+        self.edit_window = edit_window  # seconds the last message is edited instead of sending a new one
+        self.max_age = max_age  # notices older than this are dropped
+        self.max_lines = max_lines
+        self.rate = rate  # sends allowed per `per` seconds and channel
+        self.per = per
+        self._boxes = {}  # channel id -> ChannelBox
+        self.latency = deque(maxlen=samples)  # seconds from post to delivery
+        self.sent = 0
+        self.edited = 0
+        self.coalesced = 0  # notices delivered in a message shared with others
+        self.dropped = 0
+        self.failed = 0
+
+    @property
+    def depth(self):
+        return sum(len(box.pending) for box in self._boxes.values())
+
+    @property
+    def stats(self):
+        latency = sorted(self.latency)
+        return {
+            "depth": self.depth,
+            "channels": sum(1 for box in self._boxes.values() if box.task is not None),
+            "sent": self.sent,
+            "edited": self.edited,
+            "coalesced": self.coalesced,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "latency_p50": latency[len(latency) // 2] if latency else 0.0,
+            "latency_max": latency[-1] if latency else 0.0,
+        }
+
+    def post(self, channel, embed):  # queues a title only status embed, returns right away
+        if (box := self._boxes.get(channel.id)) is None:
+            box = self._boxes[channel.id] = ChannelBox(channel, self.rate)
+
+        box.pending.append(Notice(embed.title, embed.colour))
+        if box.task is None:
+            box.task = asyncio.get_event_loop().create_task(self._run(box))
+
+    def close(self):
+        for box in self._boxes.values():
+            if box.task is not None:
+                box.task.cancel()
+
+    def _wait(self, box):  # seconds until the channel can take another message
+        now = time.monotonic()
+        box.tokens = min(self.rate, box.tokens + (now - box.updated) * self.rate / self.per)
+        box.updated = now
+        return 0.0 if box.tokens >= 1 else (1 - box.tokens) * self.per / self.rate
+
+    def _take(self, box):  # leading notices sharing a colour, not older than max_age
+        now = time.monotonic()
+        group = []
+        while box.pending:
+            notice = box.pending[0]
+            if now - notice.queued > self.max_age:
+                box.pending.popleft()
+                self.dropped += 1
+            elif not group or (notice.colour == group[0].colour and len(group) < self.max_lines):
+                group.append(box.pending.popleft())
+            else:
+                break
+
+        return group
+
+    @staticmethod
+    def _merge(lines, group):
+        for notice in group:
+            if lines and lines[-1][0] == notice.text:  # same notice again, counted instead of repeated
+                lines[-1][1] += 1
+            else:
+                lines.append([notice.text, 1])
+
+        return lines
+
+    @staticmethod
+    def _render(lines, colour):
+        if len(lines) == 1 and lines[0][1] == 1:
+            return discord.Embed(title=lines[0][0], colour=colour)
+
+        return discord.Embed(
+            description="\n".join(text if count == 1 else f"{text} (x{count})" for text, count in lines),
+            colour=colour,
+        )
+
+    def _can_edit(self, box, group):
+        return (
+            box.message is not None
+            and box.colour == group[0].colour
+            and time.monotonic() - box.sent_at <= self.edit_window
+            and getattr(box.channel, "last_message_id", None) == box.message.id  # nothing was said since, DMs can't tell
+            and len(self._merge([l[:] for l in box.lines], group)) <= self.max_lines
+        )
+
+    async def _deliver(self, box, group):
+        try:
+            if self._can_edit(box, group):
+                box.lines = self._merge(box.lines, group)
+                await box.message.edit(embed=self._render(box.lines, box.colour))
+                self.edited += 1
+            else:
+                lines = self._merge([], group)
+                box.message = await box.channel.send(embed=self._render(lines, group[0].colour))
+                box.lines, box.colour = lines, group[0].colour
+                self.sent += 1
+        except discord.HTTPException:  # missing permissions, deleted channel or message
+            box.message = None
+            self.failed += len(group)
+            return
+
+        box.sent_at = now = time.monotonic()
+        self.coalesced += len(group) - 1
+        self.latency.extend(now - notice.queued for notice in group)
+
+    async def _run(self, box):
+        try:
+            while box.pending:
+                if wait := self._wait(box):  # out of budget, the burst gathers meanwhile
+                    await asyncio.sleep(wait)
+                if group := self._take(box):  # notices posted while the last one was in flight go together
+                    box.tokens -= 1
+                    await self._deliver(box, group)
+        finally:
+            box.task = None
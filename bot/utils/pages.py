@@ -0,0 +1,93 @@
+# imports
+import datetime as dt
+
+import discord
+
+
+def format_duration(ms):  # 3:05 or 1:02:03
+    seconds = int(ms // 1000)
+    hours, seconds = divmod(seconds, 3600)
+    minutes, seconds = divmod(seconds, 60)
+
+    if hours:
+        return f"{hours}:{minutes:02}:{seconds:02}"
+
+    return f"{minutes}:{seconds:02}"
+
+
+def _track_length(track, live):
+    return live if track.is_stream else format_duration(track.length or 0)
+
+
+def _shorten(text, limit):
+    return text if len(text) <= limit else text[:limit - 1] + "…"
+
+
+# queue pages rendered on demand, cached until the queue changes (Queue.version)
+class QueuePages:
+    TITLE_LIMIT = 80  # per line, keeps a 10 line page under the 1024 chars embed field limit
+
+    def __init__(self, per_page=10):
+        self.per_page = per_page
+        self._queue = None
+        self._version = None
+        self._pages = {}  # (page number, localized "live") -> rendered lines
+        self._duration = 0  # ms of upcoming tracks
+
+    def _sync(self, queue):
+        if queue is self._queue and queue.version == self._version:
+            return
+
+        self._queue = queue
+        self._version = queue.version
+        self._pages.clear()
+        self._duration = sum(t.length or 0 for t in queue.upcoming if not t.is_stream)
+
+    def count(self, queue):
+        return max(1, -(-len(queue.upcoming) // self.per_page))
+
+    def duration(self, queue):
+        self._sync(queue)
+        return self._duration
+
+    def render(self, queue, page, live="live"):
+        self._sync(queue)
+
+        try:
+            return self._pages[page, live]
+        except KeyError:
+            start = page * self.per_page
+            text = self._pages[page, live] = "\n".join(
+                f"**{start + i + 1}.** {_shorten(t.title, self.TITLE_LIMIT)} ({_track_length(t, live)})"
+                for i, t in enumerate(queue.upcoming[start:start + self.per_page])
+            )
+            return text
+
+    def embed(self, player, page, author, locale):
+        queue = player.queue
+        pages = self.count(queue)
+        page = min(max(page, 0), pages - 1)
+        live = locale.text("q_live")
+
+        embed = discord.Embed(
+            title=locale.text("q_title"),
+            description=locale.text(
+                "q_description", page=page + 1, pages=pages, tracks=len(queue.upcoming),
+                duration=format_duration(self.duration(queue)),
+            ),
+            colour=author.colour,
+            timestamp=dt.datetime.utcnow()
+        )
+        embed.set_footer(text=locale.text("invoke", author=author.display_name), icon_url=author.avatar_url)
+
+        if (current := queue.current_track) is not None:
+            embed.add_field(
+                name=locale.text("q_current"),
+                value=f"{_shorten(current.title, 200)} ({format_duration(player.position)}/{_track_length(current, live)})",
+                inline=False,
+            )
+
+        if text := self.render(queue, page, live):
+            embed.add_field(name=locale.text("q_next"), value=text, inline=False)
+
+        return embed
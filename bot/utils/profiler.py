@@ -0,0 +1,119 @@
+# imports
+import asyncio
+import cProfile
+import io
+import logging
+import pstats
+import time
+from collections import Counter
+from pathlib import Path
+
+
+def _task_stack(task):  # formatted on the loop thread, frames change while it runs
+    out = io.StringIO()
+    task.print_stack(limit=12, file=out)
+    return out.getvalue()
+
+
+def _task_name(task):
+    coro = task.get_coro()
+    return getattr(coro, "__qualname__", None) or repr(coro)
+
+
+# collects asyncio's "Executing <Handle ...> took 0.250 seconds" warnings while the loop is in debug mode
+class SlowCallbacks(logging.Handler):
+    def __init__(self):
+        super().__init__(logging.WARNING)
+        self.records = []
+
+    def emit(self, record):
+        if record.msg.startswith("Executing"):
+            self.records.append(record.getMessage())
+
+
+# profile report written to a file, with a short summary for chat
+class ProfileReport:
+    def __init__(self, path, seconds, stats, tasks, slow, waiters):
+        self.path = path
+        self.seconds = seconds
+        self.stats = stats  # pstats.Stats
+        self.tasks = tasks  # coroutine name -> pending tasks
+        self.slow = slow  # slow callback warnings
+        self.waiters = waiters  # event -> wait_for futures
+
+    def top(self, count=5):  # functions with most own time: (name, calls, seconds)
+        rows = sorted(self.stats.stats.items(), key=lambda kv: kv[1][2], reverse=True)[:count]
+        return [(f"{Path(file).name}:{line}({func})", calls, tottime) for (file, line, func), (_, calls, tottime, _, _) in rows]
+
+    @property
+    def summary(self):
+        lines = [f"{self.seconds}s profile, {sum(self.tasks.values())} tasks, {len(self.slow)} slow callbacks"]
+        lines += [f"{seconds * 1000:.0f} ms {calls}x {name}" for name, calls, seconds in self.top()]
+        lines += [f"{count}x task {name}" for name, count in self.tasks.most_common(5)]
+        if waiters := {e: n for e, n in self.waiters.items() if n}:
+            lines.append("wait_for: " + ", ".join(f"{e} {n}" for e, n in waiters.items()))
+
+        return lines
+
+
+# cProfile of the event loop thread for a few seconds, with a dump of pending tasks
+class Profiler:
+    def __init__(self, path="./bot/data/profiles", slow_callback=0.1, waiters=None):
+        self.path = Path(path)
+        self.slow_callback = slow_callback  # seconds a callback may block the loop before it's reported
+        self.waiters = waiters  # () -> {event: pending wait_for futures}
+        self.running = False
+        self.runs = 0
+
+    async def run(self, seconds):
+        if self.running:  # cProfile can't nest
+            return None
+
+        self.running = True
+        self.runs += 1
+        loop = asyncio.get_event_loop()
+        debug, slow_duration = loop.get_debug(), loop.slow_callback_duration
+        slow = SlowCallbacks()
+        logger = logging.getLogger("asyncio")
+        profile = cProfile.Profile()
+
+        logger.addHandler(slow)
+        loop.slow_callback_duration = self.slow_callback
+        loop.set_debug(True)
+        profile.enable()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            profile.disable()
+            loop.set_debug(debug)
+            loop.slow_callback_duration = slow_duration
+            logger.removeHandler(slow)
+            self.running = False
+
+        tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+        report = ProfileReport(
+            self.path / f"profile-{time.strftime('%Y%m%d-%H%M%S')}-{self.runs}.txt",
+            seconds,
+            pstats.Stats(profile),
+            Counter(_task_name(t) for t in tasks),
+            slow.records,
+            self.waiters() if self.waiters else {},
+        )
+        await loop.run_in_executor(None, self.write, report, profile, [_task_stack(t) for t in tasks])
+        return report
+
+    def write(self, report, profile, stacks):
+        self.path.mkdir(parents=True, exist_ok=True)
+        profile.dump_stats(report.path.with_suffix(".prof"))  # for snakeviz and friends
+
+        out = io.StringIO()
+        out.write("\n".join(report.summary) + "\n\n")
+        out.write(f"# slow callbacks (> {self.slow_callback}s)\n")
+        out.write("\n".join(report.slow) + "\n\n")
+        out.write("# profile\n")
+        pstats.Stats(profile, stream=out).sort_stats("cumulative").print_stats(60)
+        out.write(f"# pending tasks ({len(stacks)})\n")
+        out.write("\n".join(stacks))
+
+        with open(report.path, "w", encoding="UTF-8") as f:
+            f.write(out.getvalue())
@@ -0,0 +1,65 @@
+# imports
+import asyncio
+import heapq
+import time
+from collections import Counter
+
+
+# disconnects idle players, one heap and one task for every guild
+class IdleReaper:
+    def __init__(self, reap, timeouts):
+        self.reap = reap  # async (guild_id, reason) -> True if the player was disconnected
+        self.timeouts = timeouts  # reason -> seconds, e.g. {"empty": 60, "paused": 600, "finished": 300}
+        self._heap = []  # (deadline, guild id, reason), stale entries are skipped when popped
+        self._deadlines = {}  # (guild id, reason) -> current deadline
+        self._wake = asyncio.Event()
+        self._task = None
+        self.reclaimed = Counter()  # reason -> players disconnected
+
+    def __len__(self):
+        return len(self._deadlines)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.get_event_loop().create_task(self.run())
+
+    def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def schedule(self, guild_id, reason):
+        if (guild_id, reason) in self._deadlines:  # already counting down, keeps the first deadline
+            return
+
+        deadline = time.monotonic() + self.timeouts[reason]
+        self._deadlines[guild_id, reason] = deadline
+        heapq.heappush(self._heap, (deadline, guild_id, reason))
+        if self._heap[0][0] == deadline:  # new earliest deadline, the sleeper has to know
+            self._wake.set()
+
+    def cancel(self, guild_id, *reasons):  # no reasons cancels every pending disconnect of the guild
+        for reason in reasons or self.timeouts.keys():
+            self._deadlines.pop((guild_id, reason), None)
+
+    async def run(self):
+        while True:
+            timeout = self._heap[0][0] - time.monotonic() if self._heap else None
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+            now = time.monotonic()
+            while self._heap and self._heap[0][0] <= now:
+                deadline, guild_id, reason = heapq.heappop(self._heap)
+                if self._deadlines.get((guild_id, reason)) != deadline:  # cancelled or rescheduled
+                    continue
+
+                del self._deadlines[guild_id, reason]
+                try:
+                    if await self.reap(guild_id, reason):
+                        self.reclaimed[reason] += 1
+                except Exception as exc:
+                    print(f"Could not disconnect idle player {guild_id}: {exc}")
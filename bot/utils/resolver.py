@@ -0,0 +1,117 @@
+# imports
+import asyncio
+import random
+import time
+from collections import deque
+from urllib.parse import quote
+
+import aiohttp
+import wavelink
+
+from .cache import SearchCache
+
+
+# lavalink /loadtracks client: identical lookups in flight share one request, requests per node are capped
+class TrackResolver:
+    RETRY_STATUS = {429, 500, 502, 503, 504}
+
+    def __init__(self, pool, max_in_flight=8, retries=3, backoff=0.5, timeout=10, samples=1000):
+        self.pool = pool  # NodePool, requests go to the least loaded node
+        self.max_in_flight = max_in_flight  # concurrent requests per node, the rest wait for a slot
+        self.retries = retries
+        self.backoff = backoff  # base seconds, attempt n waits a random 0..backoff * 2**n
+        self.timeout = timeout
+        self._session = None  # created on first use, it needs the running loop
+        self._slots = {}  # node identifier -> Semaphore
+        self._in_flight = {}  # normalized query -> Task shared by every caller, same key as the search cache
+        self.waits = deque(maxlen=samples)  # seconds requests waited for a slot
+        self.requests = 0
+        self.shared = 0  # lookups answered by a request already in flight
+        self.retried = 0
+        self.failed = 0
+
+    @property
+    def stats(self):
+        waits = sorted(self.waits)
+        return {
+            "in_flight": len(self._in_flight),
+            "requests": self.requests,
+            "shared": self.shared,
+            "retried": self.retried,
+            "failed": self.failed,
+            "wait_p50": waits[len(waits) // 2] if waits else 0.0,
+            "wait_p99": waits[int(len(waits) * 0.99)] if waits else 0.0,
+            "wait_max": waits[-1] if waits else 0.0,
+        }
+
+    @property
+    def session(self):
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit_per_host=self.max_in_flight),  # keep-alive pool per node
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+        return self._session
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def get_tracks(self, query):  # same result as wavelink's Node.get_tracks: list, TrackPlaylist or None
+        key = SearchCache.normalize(query)
+        if (task := self._in_flight.get(key)) is not None:
+            self.shared += 1
+        else:
+            task = self._in_flight[key] = asyncio.get_event_loop().create_task(self._load(query))
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+
+        return await asyncio.shield(task)  # a cancelled caller doesn't cancel the others' request
+
+    async def _load(self, query):
+        node = None
+        for attempt in range(self.retries + 1):
+            if attempt:
+                self.retried += 1
+                await asyncio.sleep(random.uniform(0, self.backoff * 2 ** attempt))
+
+            if (node := self.pool.best(exclude=node) or self.pool.best()) is None:  # another node on retries if there is one
+                raise wavelink.ZeroConnectedNodes
+
+            try:
+                status, data = await self._request(node, query)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as exc:
+                print(f"Loading tracks from {node.identifier} failed: {exc!r}")
+                continue
+
+            if status == 200:
+                return self._parse(data)
+            if status not in self.RETRY_STATUS:
+                break
+            print(f"Loading tracks from {node.identifier} failed with status {status}")
+
+        self.failed += 1
+        return None
+
+    async def _request(self, node, query):
+        if (slots := self._slots.get(node.identifier)) is None:
+            slots = self._slots[node.identifier] = asyncio.Semaphore(self.max_in_flight)
+
+        queued = time.perf_counter()
+        async with slots:
+            self.waits.append(time.perf_counter() - queued)
+            self.requests += 1
+            async with self.session.get(
+                f"{node.rest_uri}/loadtracks?identifier={quote(query)}", headers={"Authorization": node.password}
+            ) as resp:
+                return resp.status, await resp.json() if resp.status == 200 else None
+
+    @staticmethod
+    def _parse(data):
+        if not data.get("tracks"):
+            return None
+
+        if data.get("playlistInfo"):
+            return wavelink.TrackPlaylist(data=data)
+
+        return [wavelink.Track(id_=track["track"], info=track["info"]) for track in data["tracks"]]
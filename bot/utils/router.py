@@ -0,0 +1,122 @@
+# imports
+import re
+from enum import Enum
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+
+class QueryKind(Enum):
+    SEARCH = 0
+    YOUTUBE_VIDEO = 1
+    YOUTUBE_PLAYLIST = 2
+    SOUNDCLOUD = 3
+    BANDCAMP = 4
+    TWITCH = 5
+    HTTP_AUDIO = 6
+    URL = 7
+
+
+# global vars
+YOUTUBE_HOSTS = {"youtube.com", "www.youtube.com", "m.youtube.com", "music.youtube.com"}
+YOUTUBE_SHORT_HOSTS = {"youtu.be", "www.youtu.be"}
+SOUNDCLOUD_HOSTS = {"soundcloud.com", "www.soundcloud.com", "m.soundcloud.com"}  # on.soundcloud.com links are redirects
+TWITCH_HOSTS = {"twitch.tv", "www.twitch.tv", "m.twitch.tv"}
+AUDIO_EXTENSIONS = (".mp3", ".ogg", ".oga", ".opus", ".flac", ".wav", ".m4a", ".aac", ".webm", ".mka")
+TRACKING_PARAMS = {  # utm_* is handled separately
+    "si", "feature", "pp", "ab_channel", "index", "start_radio", "pbjreload",
+    "fbclid", "gclid", "igshid", "mc_cid", "mc_eid", "ref_src",
+}
+VIDEO_ID = re.compile(r"[A-Za-z0-9_-]{11}")  # fixed length, no backtracking
+SEARCH_PREFIXES = ("ytsearch:", "ytmsearch:", "scsearch:")
+
+
+# where a query goes: the string to send to lavalink, and the canonical id when known
+class Route:
+    __slots__ = ("kind", "query", "identifier")
+
+    def __init__(self, kind, query, identifier=None):
+        self.kind = kind
+        self.query = query
+        self.identifier = identifier
+
+    def __repr__(self):
+        return f"Route({self.kind.name}, {self.query!r}, {self.identifier!r})"
+
+
+def _looks_like_url(query):  # cheap checks instead of a url regex
+    if query.startswith(("http://", "https://")):
+        return True
+
+    return " " not in query and "." in query and "/" in query
+
+
+def _clean_params(query):  # strips tracking params, keeps the rest in order
+    if not query:
+        return []
+
+    return [(k, v) for k, v in parse_qsl(query, keep_blank_values=True) if k not in TRACKING_PARAMS and not k.startswith("utm_")]
+
+
+def _youtube_video(video_id, playlist_id=None):
+    if playlist_id:  # video inside a playlist, lavalink loads the playlist
+        return Route(QueryKind.YOUTUBE_PLAYLIST, f"https://www.youtube.com/watch?v={video_id}&list={playlist_id}", playlist_id)
+
+    return Route(QueryKind.YOUTUBE_VIDEO, f"https://www.youtube.com/watch?v={video_id}", video_id)
+
+
+def _route_youtube(host, path, params):
+    params = dict(params)
+    playlist_id = params.get("list")
+
+    if host in YOUTUBE_SHORT_HOSTS:
+        video_id = path[1:12]
+    elif path == "/watch":
+        video_id = params.get("v", "")
+    elif path == "/playlist" and playlist_id:
+        return Route(QueryKind.YOUTUBE_PLAYLIST, f"https://www.youtube.com/playlist?list={playlist_id}", playlist_id)
+    elif path.startswith(("/shorts/", "/embed/", "/live/", "/v/")):
+        video_id = path.split("/", 3)[2][:11]
+    else:
+        return None
+
+    if not VIDEO_ID.fullmatch(video_id):
+        return None
+
+    return _youtube_video(video_id, playlist_id)
+
+
+def route(query):
+    query = query.strip()
+
+    if query.startswith(SEARCH_PREFIXES):  # already a lavalink search
+        return Route(QueryKind.SEARCH, query)
+
+    if not _looks_like_url(query):
+        return Route(QueryKind.SEARCH, f"ytsearch:{query}")
+
+    if not query.startswith(("http://", "https://")):
+        query = f"https://{query}"
+
+    try:
+        url = urlsplit(query)
+    except ValueError:  # malformed (e.g. bad ipv6 host), let lavalink decide
+        return Route(QueryKind.URL, query)
+
+    host = (url.hostname or "").lower()
+    path = url.path.rstrip("/") or "/"
+    params = _clean_params(url.query)
+
+    if host in YOUTUBE_HOSTS or host in YOUTUBE_SHORT_HOSTS:
+        if (routed := _route_youtube(host, path, params)) is not None:
+            return routed
+    elif host in SOUNDCLOUD_HOSTS:
+        return Route(QueryKind.SOUNDCLOUD, f"https://soundcloud.com{path}")
+    elif host.endswith(".bandcamp.com"):
+        return Route(QueryKind.BANDCAMP, f"https://{host}{path}")
+    elif host in TWITCH_HOSTS:
+        return Route(QueryKind.TWITCH, f"https://www.twitch.tv{path.lower()}")
+
+    canonical = f"{url.scheme}://{url.netloc}{url.path}" + (f"?{urlencode(params)}" if params else "")
+    if path.lower().endswith(AUDIO_EXTENSIONS):
+        return Route(QueryKind.HTTP_AUDIO, canonical)
+
+    return Route(QueryKind.URL, canonical)
@@ -0,0 +1,54 @@
+# imports
+import weakref
+
+import wavelink
+
+
+# wavelink track that can be weakly referenced, the registry hands out one per lavalink track
+class SharedTrack(wavelink.Track):
+    __slots__ = ("__weakref__", "stored")
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stored = False  # read back from a state file, lavalink may not play it anymore
+
+
+# interned tracks keyed by lavalink identifier, queues, the search cache and players all hold the same object
+# and a track is dropped from the registry once none of them refers to it anymore
+class TrackRegistry:
+    def __init__(self):
+        self._tracks = weakref.WeakValueDictionary()  # identifier -> SharedTrack
+        self.hits = 0  # tracks replaced by one already in memory
+        self.created = 0
+
+    def __len__(self):
+        return len(self._tracks)
+
+    @property
+    def stats(self):
+        return {"tracks": len(self._tracks), "hits": self.hits, "created": self.created}
+
+    def intern(self, track, stored=False):  # stored: decoded from a state file instead of resolved by lavalink
+        key = track.identifier or track.id
+        if (shared := self._tracks.get(key)) is not None and shared.id == track.id:
+            if shared is not track:
+                self.hits += 1
+            if not stored:  # lavalink just handed out this encoding, it's current
+                shared.stored = False
+            return shared
+
+        if not isinstance(track, SharedTrack):  # a different encoding of the same identifier replaces the old one
+            track = SharedTrack(track.id, track.info, track.query)
+        track.stored = stored
+        self._tracks[key] = track
+        self.created += 1
+        return track
+
+    def intern_result(self, result, stored=False):  # get_tracks result, playlists are interned in place
+        if isinstance(result, wavelink.TrackPlaylist):
+            result.tracks = [self.intern(track, stored) for track in result.tracks]
+            for data, track in zip(result.data.get("tracks", ()), result.tracks):
+                data["info"] = track.info  # raw data is kept for the cache file, share its info dicts too
+            return result
+
+        return [self.intern(track, stored) for track in result] if result else result
@@ -1,10 +1,15 @@
 # imports
-from bot import MusicBot
+from bot import Cluster, MusicBot, runtime
+from bot.data import config as cfg
 
 
 def main():
-    bot = MusicBot()
-    bot.run()
+    runtime.install(cfg.runtime["profile"])
+    if cfg.cluster["workers"] > 1:  # shards split across worker processes
+        Cluster(**cfg.cluster).run()
+    else:
+        bot = MusicBot()
+        bot.run()
 
 
 if __name__ == '__main__':